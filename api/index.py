@@ -1,13 +1,12 @@
 # api/index.py
-import os, sys, importlib
-from pathlib import Path
+import os, sys
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 
 # Agregar el ROOT del repo al PYTHONPATH (index.py está en /api)
-ROOT = Path(__file__).resolve().parents[1]
-if str(ROOT) not in sys.path:
-    sys.path.insert(0, str(ROOT))
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
 
 # En cloud deshabilitamos Oracle
 os.environ.setdefault("DEV_SKIP_DB", "1")
@@ -16,37 +15,33 @@ if os.getenv("DEV_SKIP_DB") == "1":
         import oracledb  # si existe, OK
     except Exception:
         class _NoOracle:
+            # referencias inocuas en import; solo falla al intentar conectar
+            @staticmethod
+            def makedsn(*a, **k):
+                return None
+
+            @staticmethod
+            def connect(*a, **k):
+                raise RuntimeError("Oracle client disabled in cloud (DEV_SKIP_DB=1)")
+
             def __getattr__(self, name):
                 raise RuntimeError("Oracle client disabled in cloud (DEV_SKIP_DB=1)")
         sys.modules["oracledb"] = _NoOracle()
 
-# Intentar import por módulos comunes
-tried = ("app.main", "app.app", "backend.main", "main")
+# Import directo de la app real (app/main.py expone "app")
 _last_error = None
 _imported_from = None
-module = None
-
-for cand in tried:
-    try:
-        module = importlib.import_module(cand)
-        _imported_from = cand
-        break
-    except Exception as e:
-        _last_error = e
-
-def _find_fastapi_app(m):
-    for name in ("app", "api", "application", "fastapi_app"):
-        if hasattr(m, name):
-            return getattr(m, name)
-    from fastapi import FastAPI as _F
-    for name, obj in vars(m).items():
-        if isinstance(obj, _F):
-            return obj
-    return None
-
-app = _find_fastapi_app(module) if module else None
+try:
+    from app.main import app
+    _imported_from = "app.main"
+except Exception as e:
+    app = None
+    _last_error = e
+    # sin traceback (caro de importar): alcanza con tipo + mensaje en los logs
+    print(f"[index.py] {type(e).__name__}: {e}", file=sys.stderr)
 
 # Si falló, exponer diagnóstico sin crashear
+# (la raíz "/" la define app/main.py; acá solo para el diagnóstico)
 if app is None:
     app = FastAPI()
     @app.get("/__import_error__")
@@ -55,25 +50,15 @@ if app is None:
             status_code=500,
             content={
                 "error": "Could not import FastAPI app",
-                "tried": list(tried),
+                "tried": ["app.main"],
                 "detail": f"{type(_last_error).__name__}: {_last_error}" if _last_error else "unknown",
             },
         )
 
-# Raíz amigable si tu app no define "/"
-try:
-    existing = {getattr(r, "path", "") for r in getattr(app.router, "routes", [])}
-    if "/" not in existing:
-        @app.get("/")
-        def root():
-            return {
-                "name": "Pizarras Multi Bolsas API",
-                "status": "ok",
-                "docs": "/docs",
-                "health": "/api/health",
-                "oracle_health": "/api/health/oracle",
-                "example": "/api/cotizaciones?plaza=Rosario&only_base=1",
-                "imported_from": _imported_from,
-            }
-except Exception:
-    pass
\ No newline at end of file
+    @app.get("/")
+    def root():
+        return {
+            "name": "Pizarras Multi Bolsas API",
+            "status": "error",
+            "detail": "/__import_error__",
+        }
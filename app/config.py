@@ -1,11 +1,27 @@
+import ipaddress
 import os
 
 DATA_DIR = os.getenv("DATA_DIR", "/app/data")
 SAVE_DEBUG_HTML = os.getenv("SAVE_DEBUG_HTML", "false").lower() == "true"
 
 API_KEY = os.getenv("API_KEY", "")
-IP_ALLOWLIST = os.getenv("IP_ALLOWLIST", "*").split(",")
+_raw_allowlist = os.getenv("IP_ALLOWLIST", "*")
+IP_ALLOWLIST = frozenset(s.strip() for s in _raw_allowlist.split(",") if s.strip())
+# rangos CIDR ("10.0.0.0/8") parseados una sola vez
+IP_NETS = tuple(ipaddress.ip_network(s, strict=False) for s in IP_ALLOWLIST if "/" in s)
+
+def is_allowed(ip: str) -> bool:
+    """True si la IP está permitida por IP_ALLOWLIST (IPs exactas, CIDR o "*")."""
+    if "*" in IP_ALLOWLIST or ip in IP_ALLOWLIST:
+        return True
+    if not IP_NETS:
+        return False
+    try:
+        addr = ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    return any(addr in net for net in IP_NETS)
 
 ORACLE_DSN = os.getenv("ORACLE_DSN", "")
 ORACLE_USER = os.getenv("ORACLE_USER", "")
-ORACLE_PASSWORD = os.getenv("ORACLE_PASSWORD", "")
\ No newline at end of file
+ORACLE_PASSWORD = os.getenv("ORACLE_PASSWORD", "")
@@ -1,47 +1,57 @@
-import oracledb
 from . import config
 
 def get_connection():
+    import oracledb  # diferido: respeta el stub DEV_SKIP_DB y no carga el driver al importar
     dsn = oracledb.makedsn(config.ORACLE_HOST, config.ORACLE_PORT, service_name=config.ORACLE_SERVICE)
     conn = oracledb.connect(user=config.ORACLE_USER, password=config.ORACLE_PASSWORD, dsn=dsn, thin=True)
     return conn
 
+# Binds posicionales (:1..:11), cada uno usado una sola vez: executemany
+# recibe tuplas y el driver arma un único array-bind por columna.
 MERGE_SQL = """
 MERGE INTO PIZARRAS_PUBLICAS T
 USING (
-  SELECT TO_DATE(:FECHA,'YYYY-MM-DD') FECHA, :PLAZA PLAZA, :FUENTE FUENTE, :PRODUCTO PRODUCTO FROM DUAL
+  SELECT TO_DATE(:1,'YYYY-MM-DD') FECHA, :2 PLAZA, :3 FUENTE, :4 PRODUCTO, :5 MONEDA,
+         :6 PRECIO_TN, :7 VAR_ABS, :8 VAR_PCT, :9 TENDENCIA, :10 HORA_FUENTE, :11 URL_FUENTE
+  FROM DUAL
 ) S
 ON (T.FECHA=S.FECHA AND T.PLAZA=S.PLAZA AND T.FUENTE=S.FUENTE AND T.PRODUCTO=S.PRODUCTO)
 WHEN MATCHED THEN UPDATE SET
-  T.PRECIO_TN=:PRECIO_TN, T.VAR_ABS=:VAR_ABS, T.VAR_PCT=:VAR_PCT,
-  T.TENDENCIA=:TENDENCIA, T.MONEDA=:MONEDA, T.HORA_FUENTE=:HORA_FUENTE, T.URL_FUENTE=:URL_FUENTE
+  T.PRECIO_TN=S.PRECIO_TN, T.VAR_ABS=S.VAR_ABS, T.VAR_PCT=S.VAR_PCT,
+  T.TENDENCIA=S.TENDENCIA, T.MONEDA=S.MONEDA, T.HORA_FUENTE=S.HORA_FUENTE, T.URL_FUENTE=S.URL_FUENTE
 WHEN NOT MATCHED THEN INSERT (
   FECHA, PLAZA, FUENTE, PRODUCTO, MONEDA, PRECIO_TN, VAR_ABS, VAR_PCT, TENDENCIA, HORA_FUENTE, URL_FUENTE
 ) VALUES (
-  TO_DATE(:FECHA,'YYYY-MM-DD'), :PLAZA, :FUENTE, :PRODUCTO, :MONEDA, :PRECIO_TN, :VAR_ABS, :VAR_PCT, :TENDENCIA, :HORA_FUENTE, :URL_FUENTE
+  S.FECHA, S.PLAZA, S.FUENTE, S.PRODUCTO, S.MONEDA, S.PRECIO_TN, S.VAR_ABS, S.VAR_PCT, S.TENDENCIA, S.HORA_FUENTE, S.URL_FUENTE
 )
 """
 
 def bulk_upsert(rows):
     if not rows:
         return {"processed": 0, "message": "No rows to insert"}
-    binds = []
-    for r in rows:
-        binds.append({
-            "FECHA": r["fecha"],
-            "PLAZA": r["plaza"],
-            "FUENTE": r["fuente"],
-            "PRODUCTO": r["producto"],
-            "MONEDA": r.get("moneda", "ARS"),
-            "PRECIO_TN": r["precio_tn"],
-            "VAR_ABS": r.get("var_abs"),
-            "VAR_PCT": r.get("var_pct"),
-            "TENDENCIA": r.get("tendencia"),
-            "HORA_FUENTE": r.get("hora_fuente"),
-            "URL_FUENTE": r.get("url_fuente"),
-        })
+    import oracledb
+    binds = [
+        (
+            r["fecha"],
+            r["plaza"],
+            r["fuente"],
+            r["producto"],
+            r.get("moneda", "ARS"),
+            r["precio_tn"],
+            r.get("var_abs"),
+            r.get("var_pct"),
+            r.get("tendencia"),
+            r.get("hora_fuente"),
+            r.get("url_fuente"),
+        )
+        for r in rows
+    ]
+    num = oracledb.DB_TYPE_NUMBER
     with get_connection() as conn:
         with conn.cursor() as cur:
-            cur.executemany(MERGE_SQL, binds)
+            # tamaños según scripts/init_oracle.sql (FECHA viaja como 'YYYY-MM-DD')
+            cur.setinputsizes(10, 50, 50, 30, 10, num, num, num, 5, 5, 400)
+            cur.executemany(MERGE_SQL, binds, arraydmlrowcounts=True)
+            affected = sum(cur.getarraydmlrowcounts())
         conn.commit()
-    return {"processed": len(rows)}
+    return {"processed": len(rows), "affected": affected}
@@ -1,6 +1,7 @@
 # backend/main.py
-# API de pizarras (FastAPI) usando requests + BeautifulSoup.
+# API de pizarras (FastAPI) usando httpx (async) + lxml.
 # Endpoints:
+#   - GET  /
 #   - GET  /api/health
 #   - GET  /api/cotizaciones?plaza=rosario|bahia|cordoba|quequen|darsena|locales&only_base=1
 #   - POST /api/start?plaza=<plaza>&interval_min=<min>        (inicia scheduler en memoria)
@@ -21,26 +22,50 @@ if __package__ in (None, ""):
     import os, sys
     sys.path.insert(0, os.path.dirname(__file__))
 
-from fastapi import FastAPI, Query
+from fastapi import FastAPI, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import StreamingResponse, ORJSONResponse
+from fastapi.concurrency import run_in_threadpool
+from contextlib import asynccontextmanager
 from typing import Dict, Any, List, Optional, Tuple
-import requests
+import asyncio
+import httpx
+import random
 import re
+import threading
 import time
+from functools import lru_cache
 import unicodedata
-from bs4 import BeautifulSoup
-import threading
-import io
-import csv
+import lxml.html
+from lxml import etree
 import os
 import hashlib
 from datetime import datetime
 
+try:
+    import oracledb  # opcional: sin driver la API funciona, solo falla el export
+except ImportError:
+    oracledb = None
+
 APP_TITLE = "Pizarras Granos API"
 SOURCE_URL = "https://www.bolsadecereales.com/camara-arbitral"
 
-app = FastAPI(title=APP_TITLE)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # el cliente HTTP se crea en el primer uso (_http_client); acá solo se cierra
+    global _HTTP
+    try:
+        yield
+    finally:
+        if _SCHEDULER_TASK is not None:
+            _SCHEDULER_TASK.cancel()
+        if _HTTP is not None:
+            await _HTTP.aclose()
+            _HTTP = None
+        if _ORACLE_POOL is not None:
+            _ORACLE_POOL.close(force=True)
+
+app = FastAPI(title=APP_TITLE, lifespan=lifespan, default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -55,17 +80,17 @@ def health_oracle():
     if not USE_DB:
         return {"status": "skip"}
     try:
-        import oracledb  # solo se intenta si USE_DB=True
+        if oracledb is None:
+            raise ModuleNotFoundError("No module named 'oracledb'")
         # Si quisieras, acá podrías abrir/cerrar una conexión mínima
         return {"status": "enabled"}
     except Exception as ex:
-        return JSONResponse(
+        return ORJSONResponse(
             {"status": "error", "detail": f"{type(ex).__name__}: {ex}"},
             status_code=500
         )
     
 # --- HTTP client con headers "de navegador" para evitar 403 ---
-import requests
 
 BROWSER_HEADERS = {
     "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
@@ -78,21 +103,41 @@ BROWSER_HEADERS = {
     "DNT": "1",
 }
 
-_SESSION = requests.Session()
-_SESSION.headers.update(BROWSER_HEADERS)
+# Se crea en el primer uso (también sin lifespan: scripts, TestClient sin "with", Vercel)
+# y lo cierra el lifespan al apagar
+_HTTP: Optional[httpx.AsyncClient] = None
+_HTTP_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+def _http_client() -> httpx.AsyncClient:
+    """Cliente async compartido (keep-alive) del event loop actual."""
+    global _HTTP, _HTTP_LOOP
+    loop = asyncio.get_running_loop()
+    if _HTTP is None or _HTTP_LOOP is not loop:
+        # un cliente de otro loop (p. ej. un asyncio.run anterior) no se puede reusar
+        # HTTP/1.1: http2 pediría el paquete 'h2'
+        _HTTP = httpx.AsyncClient(
+            headers=BROWSER_HEADERS,
+            timeout=httpx.Timeout(20.0),
+            limits=httpx.Limits(max_keepalive_connections=4, max_connections=8),
+            transport=httpx.AsyncHTTPTransport(retries=2),  # reintenta errores de conexión
+        )
+        _HTTP_LOOP = loop
+    return _HTTP
 
-def http_get(url: str, **kwargs) -> requests.Response:
+async def http_get(url: str, **kwargs) -> httpx.Response:
     """GET con headers de navegador + fallback de UA si hay 403."""
     timeout = kwargs.pop("timeout", 20)
-    resp = _SESSION.get(url, timeout=timeout, **kwargs)
+    client = _http_client()
+    resp = await client.get(url, timeout=timeout, **kwargs)
     if resp.status_code == 403:
         # cambia el UA y reintenta una vez
-        _SESSION.headers["User-Agent"] = (
+        client.headers["User-Agent"] = (
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
             "(KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
         )
-        resp = _SESSION.get(url, timeout=timeout, **kwargs)
-    resp.raise_for_status()
+        resp = await client.get(url, timeout=timeout, **kwargs)
+    if resp.status_code != 304:  # 304 solo llega a GETs condicionales, que lo resuelven ellos
+        resp.raise_for_status()
     return resp
 # --- fin HTTP client ---
 
@@ -100,168 +145,218 @@ def http_get(url: str, **kwargs) -> requests.Response:
 # Utilidades de normalización
 # ---------------------------
 
+# Acentos latinos comunes en una pasada de str.translate (en C); mismo resultado que el NFD
+_ACCENT_TBL = str.maketrans(
+    "áàäâãéèëêíìïîóòöôõúùüûñçÁÀÄÂÃÉÈËÊÍÌÏÎÓÒÖÔÕÚÙÜÛÑÇ",
+    "aaaaaeeeeiiiiooooouuuuncAAAAAEEEEIIIIOOOOOUUUUNC",
+)
+
+@lru_cache(maxsize=256)
 def _strip_accents(s: str) -> str:
-    if not isinstance(s, str):
+    # ASCII puro (títulos, alias, la mayoría de las celdas): no hay acentos que sacar
+    if not isinstance(s, str) or s.isascii():
+        return s
+    s = s.translate(_ACCENT_TBL)
+    if s.isascii():
         return s
+    # otro carácter no ASCII (°, ş, ő...): NFD genérico
     return "".join(c for c in unicodedata.normalize("NFD", s) if unicodedata.category(c) != "Mn")
 
+# alias (minúscula, sin acentos) -> (plaza_normalizada, etiqueta_titulo)
+_PLAZA_MAP: Dict[str, Tuple[str, str]] = {
+    **dict.fromkeys(("rosario", "ros", "ros-spot"), ("rosario", "Rosario")),
+    **dict.fromkeys(("bahia", "bahia blanca", "bbca", "bb", "bahia-blanca", "bahia_blanca"), ("bahia", "Bahía Blanca")),
+    **dict.fromkeys(("cordoba", "cba", "cor", "cb"), ("cordoba", "Córdoba")),
+    **dict.fromkeys(("quequen", "qqn", "que"), ("quequen", "Quequén")),
+    **dict.fromkeys(("darsena", "dar"), ("darsena", "Dársena")),
+    **dict.fromkeys(("locales", "local", "loc", "mercado local", "mercadolocal"), ("locales", "Locales")),
+}
+
+@lru_cache(maxsize=32)
 def normalize_plaza(p: str) -> Tuple[str, str]:
     """
     Devuelve (plaza_normalizada, etiqueta_titulo) tal como aparece en el HTML:
     "Rosario", "Bahía Blanca", "Córdoba", "Quequén", "Dársena".
     """
-    p_in = (p or "").strip().lower()
-    p_na = _strip_accents(p_in)
-
-    if p_in in ("rosario", "ros", "ros-spot"):
-        return "rosario", "Rosario"
-    if p_na in ("bahia", "bahia blanca", "bbca", "bb", "bahia-blanca", "bahia_blanca"):
-        return "bahia", "Bahía Blanca"
-    if p_na in ("cordoba", "cba", "cor", "cb"):
-        return "cordoba", "Córdoba"
-    if p_na in ("quequen", "qqn", "que"):
-        return "quequen", "Quequén"
-    if p_na in ("darsena", "dar"):
-        return "darsena", "Dársena"
-    if p_na in ("locales", "local", "loc", "mercado local", "mercadolocal"):
-        return "locales", "Locales"
-    return "rosario", "Rosario"
-
-def fetch_html(url: str, timeout: int = 25) -> str:
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/126.0.0.0 Safari/537.36"
-        ),
-        "Accept-Language": "es-AR,es;q=0.9",
-        "Cache-Control": "no-cache",
-    }
-    #resp = requests.get(url, headers=headers, timeout=timeout)
-    resp = http_get(url, headers=headers, timeout=timeout)
+    p_na = _strip_accents((p or "").strip().lower())
+    return _PLAZA_MAP.get(p_na, ("rosario", "Rosario"))
+
+_FETCH_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/126.0.0.0 Safari/537.36"
+    ),
+    "Accept-Language": "es-AR,es;q=0.9",
+    "Cache-Control": "no-cache",
+}
+
+async def fetch_html(url: str, timeout: int = 25) -> str:
+    # mientras esperamos al sitio, el event loop atiende otros pedidos
+    resp = await http_get(url, headers=_FETCH_HEADERS, timeout=timeout)
     resp.raise_for_status()
     return resp.text
 
+# "275.730,50" -> "275730.50" en una sola pasada (sin strings intermedios)
+_AR_DECIMAL = str.maketrans({".": "", ",": "."})
+
+# Todo Latin-1 que no sea dígito, coma, punto o signo (incluye NBSP): se borra con
+# str.translate en C; la regex queda solo para lo que esté fuera de ese rango.
+_NUM_DROP = str.maketrans("", "", "".join(chr(i) for i in range(256) if chr(i) not in "0123456789,.-"))
+
+# Regex precompiladas (se usan por celda)
+_NUM_STRIP_RE = re.compile(r"[^0-9,.\-]")
+# Futuros/entregas: mes (ENE..DIC), período (11/2025) o mercado, en una sola búsqueda
+_FUTURO_RE = re.compile(
+    r"\b(?:ENE|FEB|MAR|ABR|MAY|JUN|JUL|AGO|SEP|OCT|NOV|DIC)\b"
+    r"|\b\d{2}/\d{4}\b"
+    r"|ROS|BAHIA|CHICAGO|MATBA|CBOT",
+    re.I,
+)
+_VAR_COL_RE = re.compile(r"\bvar(iaz|iaci|iación|iacion)?\b")
+# Celdas de precio vacías; "sc" solo lo acepta _clean_num, el fallback de columnas sigue buscando
+_PRECIO_VACIO = frozenset({"s/c", "s / c", "-", ""})
+_SIN_COTIZ = _PRECIO_VACIO | {"sc"}
+
 def _clean_num(val: str) -> Optional[float]:
     """
     Limpia símbolos y espacios raros. Soporta:
       "$ 275.730", "u$s 275.730", "ARS 275.730", "275.730,00", "275,730.00"
     """
     s = (val or "").strip()
-    s_low = s.lower()
-    if s_low in ("s/c", "sc", "s / c", "-", ""):
+    if s.lower() in _SIN_COTIZ:
         return None
-    s = s.replace("\xa0", " ").replace("\u2009", " ").replace("\u202f", " ")
-    s = re.sub(r"\s+", " ", s)
-    s = re.sub(r"[^0-9,.\-]", "", s)
-    if "," in s and "." in s:
-        s = s.replace(".", "").replace(",", ".")
-    else:
-        if "," in s:
-            s = s.replace(",", ".")
+    # Eliminar todo lo que no sea dígito, coma, punto o signo
+    s = s.translate(_NUM_DROP)
+    if not s.isascii():
+        s = _NUM_STRIP_RE.sub("", s)
+    coma, punto = s.rfind(","), s.rfind(".")
+    if coma > punto:
+        # decimal ES: "1.234,56" -> "1234.56" (o solo coma: "230,5")
+        s = s.translate(_AR_DECIMAL)
+    elif coma != -1:
+        # decimal EN: "275,730.00" -> "275730.00"
+        s = s.replace(",", "")
     try:
         return float(s)
     except ValueError:
         return None
 
+@lru_cache(maxsize=512)
 def _looks_like_future(name: str) -> bool:
+    # los nombres de producto se repiten en cada refresco: el regex corre una vez por nombre
     if not name:
         return False
-    return bool(re.search(r"\b(ENE|FEB|MAR|ABR|MAY|JUN|JUL|AGO|SEP|OCT|NOV|DIC)\b", name, re.I) or
-                re.search(r"\b\d{2}/\d{4}\b", name) or
-                re.search(r"(ROS|BAHIA|CHICAGO|MATBA|CBOT)", name, re.I))
+    return _FUTURO_RE.search(name) is not None
+
+def _only_base(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [it for it in items if not _looks_like_future(it.get("producto", ""))]
 
 # ---------------------------
 # Cache simple
 # ---------------------------
 
+# Acotado por construcción: la clave es plaza normalizada (6 valores de normalize_plaza)
+# x only_base (0/1), así que nunca pasa de 12 entradas.
+# { key: (fresco_hasta_monotonic, data) }
 _CACHE: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
 _CACHE_TTL = 120.0  # segundos
+# Pasado el TTL, se sirve lo viejo hasta otro TTL más mientras se refresca en background
+_CACHE_STALE = _CACHE_TTL
 
-def _cache_get(key: str) -> Optional[List[Dict[str, Any]]]:
+def _cache_lookup(key: str) -> Tuple[Optional[List[Dict[str, Any]]], bool]:
+    """Devuelve (data, fresco). data=None si no hay entrada o ya pasó la ventana stale."""
     pack = _CACHE.get(key)
     if not pack:
-        return None
-    ts, data = pack
-    if time.time() - ts < _CACHE_TTL:
-        return data
-    return None
+        return None, False
+    fresh_until, data = pack
+    now = time.monotonic()
+    if now < fresh_until:
+        return data, True
+    if now < fresh_until + _CACHE_STALE:
+        return data, False
+    # vencida: se libera la lista en vez de retenerla hasta el próximo _cache_set
+    _CACHE.pop(key, None)
+    return None, False
 
 def _cache_set(key: str, data: List[Dict[str, Any]]) -> None:
-    _CACHE[key] = (time.time(), data)
+    # ±10% de jitter: las plazas no vencen todas en el mismo instante
+    _CACHE[key] = (time.monotonic() + _CACHE_TTL * random.uniform(0.9, 1.1), data)
+
+# Permite que el edge de Vercel comparta la respuesta entre contenedores
+_CACHE_CONTROL = f"public, max-age={int(_CACHE_TTL)}, s-maxage={int(_CACHE_TTL)}"
 
 # ---------------------------
-# Parsing con BeautifulSoup
+# Parsing con lxml
 # ---------------------------
 
-def _find_plaza_tables(soup: BeautifulSoup, titulo_text: str) -> List[BeautifulSoup]:
-    titles = soup.select("div.titulo-tabla")
-    start_idx = -1
-    for idx, t in enumerate(titles):
-        ttxt = (t.get_text() or "").strip()
-        if _strip_accents(ttxt).lower() == _strip_accents(titulo_text).lower():
-            start_idx = idx
-            break
-    if start_idx == -1:
-        return []
-
-    start_node = titles[start_idx]
-    end_node = titles[start_idx + 1] if start_idx + 1 < len(titles) else None
-
-    tables: List[BeautifulSoup] = []
-    for sib in start_node.find_all_next():
-        if end_node and sib == end_node:
-            break
-        if sib.name == "table" and "tabla-cotizaciones" in (sib.get("class") or []):
-            tables.append(sib)
-
-    if not tables:
-        candidates = start_node.find_all_next("table", class_="tabla-cotizaciones")
-        if end_node:
-            limited = []
-            for tbl in candidates:
-                if tbl.find_previous("div", class_="titulo-tabla") == start_node:
-                    limited.append(tbl)
-                else:
-                    break
-            tables = limited
-        else:
-            tables = candidates
-    return tables
-
-def _detect_currency(table_tag: BeautifulSoup, default_currency: str) -> str:
+# XPath precompiladas: el parseo y los recorridos corren en C (lxml)
+_X_TITLES_AND_TABLES = etree.XPath(
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' titulo-tabla ')]"
+    " | //table[contains(concat(' ', normalize-space(@class), ' '), ' tabla-cotizaciones ')]"
+)
+_X_THEAD = etree.XPath("(.//thead)[1]")
+_X_FIRST_TR = etree.XPath("(.//tr)[1]")
+_X_HEAD_CELLS = etree.XPath(".//th | .//td")
+_X_ROWS = etree.XPath(".//tr")
+_X_TDS = etree.XPath(".//td")
+# Texto visible (como get_text de BS4: sin comentarios, script ni style)
+_X_TEXT = etree.XPath(".//text()[not(parent::script) and not(parent::style)]")
+
+# Celdas de encabezado (ya sin acentos y en minúscula) que no son productos
+_HEADER_TOKENS = frozenset({"producto", "pesos/tn", "dolares/tn"})
+
+def _node_text(el) -> str:
+    """Equivalente a get_text(" ", strip=True) de BS4."""
+    return " ".join(t for t in (x.strip() for x in _X_TEXT(el)) if t)
+
+def _plaza_sections(doc) -> Dict[str, List[Any]]:
+    """
+    Una sola pasada en orden de documento: para cada <div class="titulo-tabla"> junta las
+    <table class="tabla-cotizaciones"> hasta el próximo título. Clave: título sin acentos
+    en minúscula (si se repite, vale el primero). Se arma una vez por documento.
+    """
+    sections: Dict[str, List[Any]] = {}
+    current: Optional[List[Any]] = None
+    for el in _X_TITLES_AND_TABLES(doc):
+        if el.tag == "div":
+            key = _strip_accents(el.text_content().strip()).lower()
+            current = [] if key in sections else sections.setdefault(key, [])
+        elif current is not None:
+            current.append(el)
+    return sections
+
+def _detect_currency(table_el, default_currency: str) -> str:
     header_text = ""
-    thead = table_tag.find("thead")
-    if thead:
-        header_text = thead.get_text(" ", strip=True)
-    else:
-        first_tr = table_tag.find("tr")
-        if first_tr:
-            header_text = first_tr.get_text(" ", strip=True)
+    head = _X_THEAD(table_el) or _X_FIRST_TR(table_el)
+    if head:
+        header_text = _node_text(head[0])
 
     h = _strip_accents((header_text or "").lower())
-    if "dolares" in h or "dólares" in h:
+    if "dolares" in h:
         return "USD"
     if "pesos" in h:
         return "ARS"
     return default_currency
 
 def _td_text(td) -> str:
-    txt = td.get_text(" ", strip=True)
-    txt = re.sub(r"\s+", " ", txt or "")
-    return txt.strip()
+    # _node_text + colapsar espacios (incl. NBSP) en una sola pasada: str.split() ya corta
+    # por cualquier blanco unicode, igual que \s+
+    return " ".join(t for x in _X_TEXT(td) for t in x.split())
+
+# columna -> palabras que la identifican en el encabezado (ya sin acentos y en minúscula)
+_HEADER_KEYWORDS = (
+    ("producto", ("producto", "mercaderia")),
+    ("actual", ("actual", "precio")),
+    ("anterior", ("anterior",)),
+)
 
-def _header_map(table_tag: BeautifulSoup) -> Dict[str, int]:
+def _header_map(table_el) -> Dict[str, int]:
     heads = []
-    thead = table_tag.find("thead")
-    if thead:
-        tr = thead.find("tr")
-        if tr:
-            heads = tr.find_all(["th", "td"])
-    else:
-        first_tr = table_tag.find("tr")
-        if first_tr:
-            heads = first_tr.find_all(["th", "td"])
+    thead = _X_THEAD(table_el)
+    first_tr = _X_FIRST_TR(thead[0] if thead else table_el)
+    if first_tr:
+        heads = _X_HEAD_CELLS(first_tr[0])
 
     if not heads:
         return {}
@@ -269,47 +364,55 @@ def _header_map(table_tag: BeautifulSoup) -> Dict[str, int]:
     names = [_strip_accents(_td_text(h)).lower() for h in heads]
     m: Dict[str, int] = {}
     for i, n in enumerate(names):
-        if "producto" in n or "mercaderia" in n:
-            m["producto"] = i
-        if "actual" in n or "precio" in n:
-            m["actual"] = i
-        if "anterior" in n:
-            m["anterior"] = i
-        if re.search(r"\bvar(iaz|iaci|iación|iacion)?\b", n):
+        for key, words in _HEADER_KEYWORDS:
+            if any(w in n for w in words):
+                m[key] = i
+        # la regex (límites de palabra) solo si el texto contiene "var"
+        if "var" in n and _VAR_COL_RE.search(n):
             m["var"] = i
     return m
 
-def _parse_table(table_tag: BeautifulSoup, forced_currency: Optional[str], order_idx: int) -> List[Dict[str, Any]]:
-    currency = forced_currency or _detect_currency(table_tag, default_currency=("ARS" if order_idx == 0 else "USD"))
-    rows = table_tag.find_all("tr")
+# Normalización de nombres (clave: producto en minúscula)
+RENAME = {
+    "trigo": "Trigo",
+    "maiz": "Maiz",
+    "maíz": "Maiz",
+    "soja": "Soja",
+    "sorgo": "Sorgo",
+    "girasol": "Girasol",
+    "trigo art 12": "Trigo Art 12",
+}
+
+def _parse_table(table_el, forced_currency: Optional[str], order_idx: int) -> List[Dict[str, Any]]:
+    currency = forced_currency or _detect_currency(table_el, default_currency=("ARS" if order_idx == 0 else "USD"))
+    rows = _X_ROWS(table_el)
     items: List[Dict[str, Any]] = []
 
-    header = _header_map(table_tag)
-    header_cols = set(header.values()) if header else set()
+    header = _header_map(table_el)
+    prod_idx = header.get("producto", 0)
+    actual_idx = header.get("actual")
 
     for r_idx, tr in enumerate(rows):
-        classes = " ".join(tr.get("class", [])).lower()
+        classes = (tr.get("class") or "").lower()
         if "head" in classes or "encabezado" in classes:
             continue
 
-        tds = tr.find_all("td")
+        tds = _X_TDS(tr)
         if len(tds) < 2:
             continue
 
-        if header and r_idx == 0 and len(header_cols) > 0:
+        if header and r_idx == 0:
             continue
 
-        prod_idx = header.get("producto", 0) if header else 0
         producto = _td_text(tds[prod_idx]) if prod_idx < len(tds) else _td_text(tds[0])
 
         pna = _strip_accents(producto).lower()
-        if not producto or pna in ("producto", "pesos/tn", "dolares/tn", "dólares/tn"):
+        if not producto or pna in _HEADER_TOKENS:
             continue
 
         precio = None
-        if header and "actual" in header and header["actual"] < len(tds):
-            precio_txt = _td_text(tds[header["actual"]])
-            precio = _clean_num(precio_txt)
+        if actual_idx is not None and actual_idx < len(tds):
+            precio = _clean_num(_td_text(tds[actual_idx]))
 
         if precio is None:
             for i in range(1, min(5, len(tds))):
@@ -317,38 +420,75 @@ def _parse_table(table_tag: BeautifulSoup, forced_currency: Optional[str], order
                     continue
                 txt = _td_text(tds[i])
                 num = _clean_num(txt)
-                if num is not None or txt.lower() in ("s/c", "s / c", "-", ""):
-                    precio = _clean_num(txt)
+                if num is not None or txt.lower() in _PRECIO_VACIO:
+                    precio = num
                     break
 
         items.append({
-            "producto": producto.strip(),
+            "producto": RENAME.get(producto.lower(), producto),
             "precio": precio,
             "moneda": currency,
             "anterior": "s/c",
             "variacion": "s/c",
         })
 
-    rename = {
-        "trigo": "Trigo",
-        "maiz": "Maiz",
-        "maíz": "Maiz",
-        "soja": "Soja",
-        "sorgo": "Sorgo",
-        "girasol": "Girasol",
-        "trigo art 12": "Trigo Art 12",
-    }
-    norm_items: List[Dict[str, Any]] = []
-    for it in items:
-        key = rename.get(it["producto"].strip().lower(), it["producto"].strip())
-        norm_items.append({**it, "producto": key})
-    return norm_items
+    return items
 
-def scrape_plaza(plaza_norm: str) -> List[Dict[str, Any]]:
+# Secciones de SOURCE_URL compartidas por todas las plazas: (ts_monotonic, sections).
+# El lock evita que dos pedidos concurrentes descarguen y parseen a la vez.
+_DOC_CACHE: Tuple[float, Optional[Dict[str, List[Any]]]] = (0.0, None)
+_DOC_LOCK = asyncio.Lock()
+def _slice_pizarras(html: str) -> str:
+    """
+    Recorta el HTML al tramo entre el primer título de plaza y el cierre de la última
+    tabla: <head>, scripts, menú y footer no se parsean. Sin títulos, devuelve todo.
+    """
+    i = html.find("titulo-tabla")
+    if i < 0:
+        return html
+    start = html.rfind("<", 0, i)
+    end = html.rfind("</table>")
+    if start < 0 or end < i:
+        return html
+    return html[start:end + len("</table>")]
+
+# Validadores de la última descarga: GET condicional y hash del cuerpo para no re-parsear
+_DOC_META: Dict[str, Any] = {"etag": None, "last_modified": None, "hash": None}
+
+async def _fetch_sections(prev: Optional[Dict[str, List[Any]]]) -> Dict[str, List[Any]]:
+    headers = dict(_FETCH_HEADERS)
+    if prev is not None:
+        if _DOC_META["etag"]:
+            headers["If-None-Match"] = _DOC_META["etag"]
+        if _DOC_META["last_modified"]:
+            headers["If-Modified-Since"] = _DOC_META["last_modified"]
+    resp = await http_get(SOURCE_URL, headers=headers, timeout=25)
+    if prev is not None and resp.status_code == 304:
+        return prev
+    body_hash = hashlib.blake2b(resp.content, digest_size=8).digest()
+    _DOC_META.update(etag=resp.headers.get("ETag"), last_modified=resp.headers.get("Last-Modified"))
+    if prev is not None and body_hash == _DOC_META["hash"]:
+        return prev  # mismo HTML que el tick anterior: las secciones ya parseadas sirven
+    _DOC_META["hash"] = body_hash
+    return _plaza_sections(lxml.html.fromstring(_slice_pizarras(resp.text)))
+
+async def _get_sections() -> Dict[str, List[Any]]:
+    global _DOC_CACHE
+    ts, sections = _DOC_CACHE
+    if sections is not None and time.monotonic() - ts < _CACHE_TTL:
+        return sections
+    async with _DOC_LOCK:
+        ts, sections = _DOC_CACHE
+        if sections is not None and time.monotonic() - ts < _CACHE_TTL:
+            return sections  # lo trajo otro pedido mientras esperábamos
+        sections = await _fetch_sections(sections)
+        _DOC_CACHE = (time.monotonic(), sections)
+        return sections
+
+async def scrape_plaza(plaza_norm: str) -> List[Dict[str, Any]]:
     if plaza_norm == "locales":
         return []
-    html = fetch_html(SOURCE_URL)
-    soup = BeautifulSoup(html, "html.parser")
+    sections = await _get_sections()
     label_map = {
         "rosario": "Rosario",
         "bahia": "Bahía Blanca",
@@ -357,7 +497,7 @@ def scrape_plaza(plaza_norm: str) -> List[Dict[str, Any]]:
         "darsena": "Dársena",
     }
     titulo_text = label_map.get(plaza_norm, "Rosario")
-    tables = _find_plaza_tables(soup, titulo_text)
+    tables = sections.get(_strip_accents(titulo_text).lower())
     if not tables:
         return []
     items: List[Dict[str, Any]] = []
@@ -370,85 +510,162 @@ def scrape_plaza(plaza_norm: str) -> List[Dict[str, Any]]:
 # Endpoints de datos
 # ---------------------------
 
+@app.get("/")
+def root() -> Dict[str, Any]:
+    return {
+        "name": "Pizarras Multi Bolsas API",
+        "status": "ok",
+        "docs": "/docs",
+        "health": "/api/health",
+        "oracle_health": "/api/health/oracle",
+        "example": "/api/cotizaciones?plaza=Rosario&only_base=1",
+    }
+
 @app.get("/api/health")
 def health() -> Dict[str, Any]:
     return {"ok": True, "service": APP_TITLE, "ts": time.time()}
 
+# Un lock por clave: tras el vencimiento, solo el primer pedido scrapea; el resto espera
+# y lee el valor nuevo. Y a lo sumo un refresco en background por plaza.
+_KEY_LOCKS: Dict[str, asyncio.Lock] = {}
+_REVALIDATING: Dict[str, "asyncio.Task"] = {}
+
+def _revalidate(plaza_norm: str) -> None:
+    if plaza_norm in _REVALIDATING:
+        return
+    t = asyncio.create_task(_refresh_plaza(plaza_norm))
+    _REVALIDATING[plaza_norm] = t
+    t.add_done_callback(lambda _t: _REVALIDATING.pop(plaza_norm, None))
+
+def _cache_views(plaza_norm: str, items: List[Dict[str, Any]]) -> Dict[int, List[Dict[str, Any]]]:
+    """Un scraping llena las dos vistas (ob=0 completa, ob=1 sin futuros)."""
+    views = {0: items, 1: _only_base(items)}
+    for ob, view in views.items():
+        _cache_set(f"{plaza_norm}|ob={ob}", view)
+    return views
+
+async def _load_items(plaza_norm: str, only_base: int) -> Tuple[List[Dict[str, Any]], bool, bool]:
+    """(items, cached, stale) de la plaza. Levanta si falla el scraping."""
+    cache_key = f"{plaza_norm}|ob={int(only_base==1)}"
+
+    cached, fresh = _cache_lookup(cache_key)
+    if cached is not None:
+        if not fresh:
+            # stale-while-revalidate: respondemos ya con lo viejo y refrescamos aparte
+            _revalidate(plaza_norm)
+        return cached, True, not fresh
+
+    async with _KEY_LOCKS.setdefault(cache_key, asyncio.Lock()):
+        items, fresh = _cache_lookup(cache_key)
+        if items is not None:
+            # lo llenó otro pedido mientras esperábamos (o quedó vencido): igual que arriba
+            if not fresh:
+                _revalidate(plaza_norm)
+            return items, True, not fresh
+        views = _cache_views(plaza_norm, await scrape_plaza(plaza_norm))
+        return views[int(only_base == 1)], False, False
+
+async def _items_or_empty(plaza_norm: str, only_base: int) -> List[Dict[str, Any]]:
+    """Para CSV / Power BI / Oracle: ante error, sin filas (como /api/cotizaciones)."""
+    try:
+        return (await _load_items(plaza_norm, only_base))[0]
+    except Exception:
+        return []
+
 @app.get("/api/cotizaciones")
-def cotizaciones(
+async def cotizaciones(
     plaza: str = Query("rosario"),
     only_base: int = Query(1),
+    response: Response = None,
 ) -> Dict[str, Any]:
     plaza_norm, _ = normalize_plaza(plaza)
-    cache_key = f"{plaza_norm}|ob={int(only_base==1)}"
-
-    cached = _cache_get(cache_key)
-    if cached is not None:
-        return {"items": cached, "plaza": plaza_norm, "source_url": SOURCE_URL, "cached": True}
-
     try:
-        items = scrape_plaza(plaza_norm)
-        if int(only_base) == 1:
-            items = [it for it in items if not _looks_like_future(it.get("producto", ""))]
-        _cache_set(cache_key, items)
-        return {"items": items, "plaza": plaza_norm, "source_url": SOURCE_URL, "cached": False}
-    except requests.Timeout:
+        items, was_cached, stale = await _load_items(plaza_norm, only_base)
+    except httpx.TimeoutException:
         return {"items": [], "plaza": plaza_norm, "source_url": SOURCE_URL, "error": "timeout"}
     except Exception as ex:
         return {"items": [], "plaza": plaza_norm, "source_url": SOURCE_URL, "error": f"{type(ex).__name__}: {ex}"}
+    if response is not None:
+        response.headers["Cache-Control"] = _CACHE_CONTROL
+    out = {"items": items, "plaza": plaza_norm, "source_url": SOURCE_URL, "cached": was_cached}
+    if stale:
+        out["stale"] = True
+    return out
 
 # ---------------------------
 # Scheduler en memoria
 # ---------------------------
 
-_SCHEDULERS: Dict[str, threading.Timer] = {}
+# { plaza: (interval_min, próxima_corrida_monotonic) }. Una sola tarea maestra recorre
+# la agenda: las plazas que vencen en el mismo tick se refrescan juntas con gather y
+# comparten una única descarga/parseo (_get_sections), en vez de un loop por plaza.
+_SCHEDULE: Dict[str, Tuple[int, float]] = {}
+_SCHEDULER_TASK: Optional["asyncio.Task"] = None
+_SCHEDULE_CHANGED = asyncio.Event()
 
-def _schedule_job(plaza_norm: str, interval_min: int):
+async def _refresh_plaza(plaza_norm: str) -> None:
     try:
-        items = scrape_plaza(plaza_norm)
-        _cache_set(f"{plaza_norm}|ob=1", [it for it in items if not _looks_like_future(it.get("producto",""))])
-        _cache_set(f"{plaza_norm}|ob=0", items)
+        _cache_views(plaza_norm, await scrape_plaza(plaza_norm))
     except Exception:
         pass
-    t = threading.Timer(interval_min * 60, _schedule_job, args=(plaza_norm, interval_min))
-    _SCHEDULERS[plaza_norm] = t
-    t.daemon = True
-    t.start()
+
+async def _scheduler_loop():
+    while True:
+        now = time.monotonic()
+        due = [p for p, (_, nxt) in _SCHEDULE.items() if nxt <= now]
+        if due:
+            await asyncio.gather(*(_refresh_plaza(p) for p in due))
+            for p in due:
+                interval_min, _ = _SCHEDULE[p]
+                _SCHEDULE[p] = (interval_min, now + interval_min * 60)
+        _SCHEDULE_CHANGED.clear()
+        wait = min(nxt for _, nxt in _SCHEDULE.values()) - time.monotonic()
+        try:
+            # se despierta antes si /api/start cambia la agenda
+            await asyncio.wait_for(_SCHEDULE_CHANGED.wait(), timeout=max(wait, 0))
+        except asyncio.TimeoutError:
+            pass
 
 @app.post("/api/start")
-def start_automation(
+async def start_automation(
     plaza: str = Query("rosario"),
     interval_min: int = Query(1440, ge=1, le=60*24*7),
 ):
+    global _SCHEDULER_TASK
     plaza_norm, _ = normalize_plaza(plaza)
-    t_prev = _SCHEDULERS.get(plaza_norm)
-    if t_prev:
-        try: t_prev.cancel()
-        except Exception: pass
-    _schedule_job(plaza_norm, interval_min)
+    await _refresh_plaza(plaza_norm)
+    _SCHEDULE[plaza_norm] = (interval_min, time.monotonic() + interval_min * 60)
+    if _SCHEDULER_TASK is None or _SCHEDULER_TASK.done():
+        _SCHEDULER_TASK = asyncio.create_task(_scheduler_loop())
+    _SCHEDULE_CHANGED.set()
     return {"ok": True, "plaza": plaza_norm, "interval_min": interval_min}
 
 # ---------------------------
 # CSV
 # ---------------------------
 
+class _Echo:
+    """Pseudo-buffer para csv.writer: devuelve la línea en vez de acumularla."""
+    def write(self, value: str) -> str:
+        return value
+
+def _csv_rows(plaza_norm: str, items: List[Dict[str, Any]]):
+    import csv  # solo lo usa la descarga CSV
+    writer = csv.writer(_Echo())
+    yield writer.writerow(["plaza", "producto", "moneda", "precio"])
+    for it in items:
+        yield writer.writerow([plaza_norm, it.get("producto",""), it.get("moneda",""), it.get("precio")])
+
 @app.get("/api/csv")
-def csv_cotizaciones(
+async def csv_cotizaciones(
     plaza: str = Query("rosario"),
     only_base: int = Query(1)
 ):
     plaza_norm, _ = normalize_plaza(plaza)
-    payload = cotizaciones(plaza_norm, only_base)
-    items = payload.get("items", [])
-    buf = io.StringIO()
-    writer = csv.writer(buf)
-    writer.writerow(["plaza", "producto", "moneda", "precio"])
-    for it in items:
-        writer.writerow([plaza_norm, it.get("producto",""), it.get("moneda",""), it.get("precio")])
-    buf.seek(0)
+    items = await _items_or_empty(plaza_norm, only_base)
     fn = f"cotizaciones_{plaza_norm}.csv"
     return StreamingResponse(
-        iter([buf.getvalue()]),
+        _csv_rows(plaza_norm, items),
         media_type="text/csv; charset=utf-8",
         headers={"Content-Disposition": f'attachment; filename="{fn}"'}
     )
@@ -469,8 +686,23 @@ _GRAIN_MAP = {
 
 _PIZARRA_MAP = {"rosario":"ROS", "bahia":"BHI", "cordoba":"CBA", "quequen":"QQN", "darsena":"DAR", "locales":"LOC"}
 
+# Pool de sesiones Oracle: se crea en el primer export (sin ORACLE_* la app igual levanta)
+# y cada export toma una sesión ya autenticada; conn.close() la devuelve al pool.
+_ORACLE_POOL = None
+_ORACLE_POOL_LOCK = threading.Lock()
+
 def _oracle_connect():
-    import oracledb
+    global _ORACLE_POOL
+    if _ORACLE_POOL is None:
+        with _ORACLE_POOL_LOCK:
+            if _ORACLE_POOL is None:
+                _ORACLE_POOL = _oracle_create_pool()
+    return _ORACLE_POOL.acquire()
+
+def _oracle_create_pool():
+    # corre una sola vez (la primera vez que se pide el pool): init_oracle_client no se reintenta por export
+    if oracledb is None:
+        raise RuntimeError("oracledb no está instalado.")
     client_dir = os.environ.get("ORACLE_CLIENT_LIB_DIR")
     try:
         if client_dir:
@@ -488,17 +720,22 @@ def _oracle_connect():
     if not all([host, port, service, user, password]):
         raise RuntimeError("Faltan variables ORACLE_* para la conexión.")
     dsn = f"{host}:{port}/{service}"
-    return oracledb.connect(user=user, password=password, dsn=dsn)
+    return oracledb.create_pool(user=user, password=password, dsn=dsn, min=1, max=4, increment=1)
 
-def _uvalue16(grano: int, siglo: int, cosecha: str, pizarra: str, fechavig: int,
-              mes: Optional[str], ejercicio: Optional[int], precioref: float) -> int:
+def _uvalue_ctx(siglo: int, cosecha: str, pizarra: str, fechavig: int,
+                mes: Optional[str], ejercicio: Optional[int]) -> str:
+    """Parte constante del UVALUE: se arma una vez por export, no por fila."""
+    return f"{siglo}|{cosecha}|{pizarra}|{fechavig}|{mes or ''}|{ejercicio or ''}"
+
+def _uvalue16(grano: int, ctx: str, precioref: float) -> int:
     """
     UVALUE <= 16 dígitos (NUMBER(16)):
     generamos hash y lo truncamos a 16 dígitos, evitando 0.
+    Mismo blake2b de siempre (UVALUE es PK: cambiar el hash duplicaría filas ya exportadas),
+    pero leyendo el digest como entero sin pasar por hex.
     """
-    base = f"{grano}|{siglo}|{cosecha}|{pizarra}|{fechavig}|{mes or ''}|{ejercicio or ''}|{precioref:.2f}"
-    h = hashlib.blake2b(base.encode("utf-8"), digest_size=8).hexdigest()  # 64 bits
-    n = int(h, 16)
+    base = f"{grano}|{ctx}|{precioref:.2f}"
+    n = int.from_bytes(hashlib.blake2b(base.encode("utf-8"), digest_size=8).digest(), "big")  # 64 bits
     n = n % (10**16)  # máximo 16 dígitos
     if n == 0:
         n = 1
@@ -508,24 +745,46 @@ def _schema() -> str:
     # Permite configurar el esquema destino; por defecto TEST_EMAN
     return os.environ.get("ORACLE_SCHEMA", "TEST_EMAN").strip()
 
-def _grain_exists(conn, grano_code: int) -> bool:
-    # Compatible con versiones antiguas: usar ROWNUM en lugar de FETCH FIRST
-    cur = conn.cursor()
-    cur.execute(f"SELECT 1 FROM {_schema()}.GRANO WHERE GRANO = :g AND ROWNUM = 1", {"g": grano_code})
-    return cur.fetchone() is not None
+def _existing_grains(cur, codes) -> set:
+    """Códigos de GRANO que existen en Oracle, en una sola consulta."""
+    codes = sorted(codes)
+    if not codes:
+        return set()
+    binds = ", ".join(f":g{i}" for i in range(len(codes)))
+    cur.execute(f"SELECT GRANO FROM {_schema()}.GRANO WHERE GRANO IN ({binds})",
+                {f"g{i}": c for i, c in enumerate(codes)})
+    return {r[0] for r in cur.fetchall()}
+
+# GRANO es tabla de referencia: los códigos válidos de _GRAIN_MAP se consultan una vez por hora
+_GRANOS_TTL = 3600.0
+_VALID_GRANOS: Tuple[float, frozenset] = (0.0, frozenset())
+
+def _valid_granos(cur) -> frozenset:
+    global _VALID_GRANOS
+    ts, granos = _VALID_GRANOS
+    if ts and time.monotonic() - ts < _GRANOS_TTL:
+        return granos
+    granos = frozenset(_existing_grains(cur, set(_GRAIN_MAP.values())))
+    # un resultado vacío no se cachea: descartaría todas las filas del export por una hora
+    if granos:
+        _VALID_GRANOS = (time.monotonic(), granos)
+    return granos
 
 @app.post("/api/export/oracle")
-def export_oracle(
+async def export_oracle(
     plaza: str = Query("rosario"),
     only_base: int = Query(1)
 ):
     plaza_norm, _ = normalize_plaza(plaza)
-    payload = cotizaciones(plaza_norm, only_base)
-    items = payload.get("items", [])
+    items = await _items_or_empty(plaza_norm, only_base)
+    # oracledb bloquea: el export corre en el threadpool, no en el event loop
+    return await run_in_threadpool(_export_rows, plaza_norm, items)
+
+def _export_rows(plaza_norm: str, items: List[Dict[str, Any]]):
     rows = [it for it in items if isinstance(it.get("precio"), (int, float)) and (it.get("precio") or 0) > 0]
 
     if not rows:
-        return JSONResponse({"ok": False, "error": "sin_datos"}, status_code=400)
+        return ORJSONResponse({"ok": False, "error": "sin_datos"}, status_code=400)
 
     # Valores compatibles con TB_REF
     siglo = 21                             # NUMBER(3)
@@ -535,32 +794,46 @@ def export_oracle(
     mes = None
     ejercicio = None
 
-    inserted = 0
     skipped = 0
-    already_present = 0
     conn = None
     try:
         conn = _oracle_connect()
         cur = conn.cursor()
 
-        for it in rows:
-            prod = it.get("producto")
-            grano = _GRAIN_MAP.get(prod, 0)
-            if grano == 0:
-                skipped += 1
-                continue
+        # validación de granos contra el set cacheado, no un SELECT por fila ni por export
+        validos = _valid_granos(cur)
 
-            if not _grain_exists(conn, grano):
+        ctx = _uvalue_ctx(siglo, cosecha, pizarra, fechavig, mes, ejercicio)
+        params: List[Dict[str, Any]] = []
+        for it in rows:
+            grano = _GRAIN_MAP.get(it.get("producto"), 0)
+            if grano not in validos:
                 skipped += 1
                 continue
 
             precioref = float(it.get("precio") or 0.0)
             precioref = round(precioref, 2)  # NUMBER(16,2)
 
-            uvalue = _uvalue16(grano, siglo, cosecha, pizarra, fechavig, mes, ejercicio, precioref)
+            uvalue = _uvalue16(grano, ctx, precioref)
+            params.append({
+                "grano": grano,
+                "siglo": siglo,
+                "cosecha": cosecha,
+                "pizarra": pizarra,
+                "fechavig": fechavig,
+                "mes": mes,
+                "ejercicio": ejercicio,
+                "precioref": precioref,
+                "uvalue": uvalue,
+            })
 
-            # MERGE idempotente por UVALUE (PK). rowcount=1 → se insertó; 0 → ya existía.
-            cur.execute(f"""
+        inserted = 0
+        already_present = 0
+        errors: List[str] = []
+        if params:
+            # MERGE idempotente por UVALUE (PK), todas las filas en un solo round-trip.
+            # rowcount por fila: 1 → se insertó; 0 → ya existía.
+            cur.executemany(f"""
                 MERGE INTO {_schema()}.TB_REF t
                 USING (SELECT :grano AS grano,
                               :siglo AS siglo,
@@ -576,33 +849,24 @@ def export_oracle(
                 WHEN NOT MATCHED THEN
                   INSERT (GRANO, SIGLO, COSECHA, PIZARRA, FECHAVIG, MES, EJERCICIO, PRECIOREF, UVALUE)
                   VALUES (s.grano, s.siglo, s.cosecha, s.pizarra, s.fechavig, s.mes, s.ejercicio, s.precioref, s.uvalue)
-            """, {
-                "grano": grano,
-                "siglo": siglo,
-                "cosecha": cosecha,
-                "pizarra": pizarra,
-                "fechavig": fechavig,
-                "mes": mes,
-                "ejercicio": ejercicio,
-                "precioref": precioref,
-                "uvalue": uvalue,
-            })
-
-            if cur.rowcount and cur.rowcount > 0:
-                inserted += 1
-            else:
-                already_present += 1
+            """, params, batcherrors=True, arraydmlrowcounts=True)
+            errors = [f"fila {e.offset}: {e.message}" for e in cur.getbatcherrors()]
+            inserted = sum(1 for n in cur.getarraydmlrowcounts() if n > 0)
+            already_present = len(params) - inserted - len(errors)
 
         conn.commit()
-        return {
-            "ok": True,
+        out = {
+            "ok": not errors,
             "exported": inserted,
             "already": already_present,
             "skipped": skipped,
             "plaza": plaza_norm
         }
+        if errors:
+            out["errors"] = errors
+        return out
     except Exception as ex:
-        return JSONResponse({"ok": False, "error": f"{type(ex).__name__}: {ex}"}, status_code=500)
+        return ORJSONResponse({"ok": False, "error": f"{type(ex).__name__}: {ex}"}, status_code=500)
     finally:
         try:
             if conn: conn.close()
@@ -614,14 +878,13 @@ def export_oracle(
 # ---------------------------
 
 @app.get("/api/powerbi/cotizaciones")
-def powerbi_cotizaciones(
+async def powerbi_cotizaciones(
     plaza: str = Query("rosario"),
     only_base: int = Query(1)
 ):
     """Salida JSON plana apta para Power BI (Get Data → Web)."""
     plaza_norm, _ = normalize_plaza(plaza)
-    payload = cotizaciones(plaza_norm, only_base)
-    items = payload.get("items", [])
+    items = await _items_or_empty(plaza_norm, only_base)
 
     now_iso = datetime.utcnow().isoformat() + "Z"
     fechavig = int(datetime.utcnow().strftime("%Y%m%d"))
@@ -1,16 +1,26 @@
+import io
 import os
 import re
+import csv
+import math
 import time
+import asyncio
+import threading
 import json
 from datetime import datetime, timezone, date
+from functools import lru_cache
+from operator import itemgetter
 from typing import Dict, List, Optional, Tuple
 
 import oracledb
 import httpx
 from fastapi import FastAPI, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, PlainTextResponse
-from bs4 import BeautifulSoup
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+import lxml.html
+from lxml import etree
 
 # --- Cache en memoria por plaza (último scrape OK) ---
 CACHE = {
@@ -36,7 +46,8 @@ PLAZA_CODES = {
 
 # Orden y lista “base” (para only_base=1)
 PRODUCT_ORDER = ["Trigo", "Maiz", "Soja", "Girasol", "Sorgo", "Cebada Forrajera"]
-PRODUCTS_BASE = set(["Trigo", "Maiz", "Soja", "Girasol", "Sorgo"])
+PRODUCTS_BASE = frozenset({"Trigo", "Maiz", "Soja", "Girasol", "Sorgo"})
+PRODUCT_RANK = {name: i for i, name in enumerate(PRODUCT_ORDER)}
 
 # Mapeo a códigos internos (según tu ERP)
 GRAIN_CODE = {
@@ -57,7 +68,8 @@ START_CONFIG: Dict[str, object] = {
     "started_at_utc": None,
 }
 
-app = FastAPI()
+# orjson serializa bastante más rápido que json stdlib
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Si usás el proxy de Vite, CORS no es estrictamente necesario,
 # pero lo dejo abierto por si querés exponer la API.
@@ -67,12 +79,20 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# JSON/CSV comprimidos para los clientes (las respuestas chicas van sin comprimir)
+app.add_middleware(GZipMiddleware, minimum_size=500)
 
 
 # --------------------------------------------------------------------------------------
 # Utilitarios
 # --------------------------------------------------------------------------------------
 
+# Regex precompiladas (se usan por fila)
+_PRICE_STRIP = re.compile(r"[^0-9\.,\-]")
+_WS = re.compile(r"\s+")
+_AR_DECIMAL = str.maketrans({".": "", ",": "."})
+
+@lru_cache(maxsize=512)
 def parse_price(text: str) -> Optional[float]:
     """
     Convierte precios estilo ES (p.ej. '480.000,00', '0,00', 's/c') a float.
@@ -84,27 +104,42 @@ def parse_price(text: str) -> Optional[float]:
     if "s/c" in s or s == "-" or s == "sc":
         return None
     # Mantener sólo dígitos, puntos y comas
-    s = re.sub(r"[^0-9\.,\-]", "", s)
+    s = _PRICE_STRIP.sub("", s)
     if not s:
         return None
-    # Quitar separadores de miles (.)
-    s = s.replace(".", "")
-    # Cambiar coma por punto para decimales
-    s = s.replace(",", ".")
+    # Quitar separadores de miles (.) y cambiar coma por punto, en una sola pasada
+    s = s.translate(_AR_DECIMAL)
     try:
-        return float(s)
+        v = float(s)
     except ValueError:
         return None
+    # NaN/Inf no llegan al JSON (p.ej. un número gigante desborda a inf)
+    return v if math.isfinite(v) else None
+
+
+# Nodos de texto visibles (igual que get_text: sin comentarios, script ni style)
+_TEXT_NODES = etree.XPath(".//text()[not(parent::script) and not(parent::style)]")
+_HEAD_TR = etree.XPath(".//tr[contains(concat(' ', normalize-space(@class), ' '), ' head ')]")
+# Celdas de rótulo (en minúscula) que no son productos
+_ROW_LABELS = frozenset({"producto", "productos", "pesos/tn", "dólares/tn", "dolares/tn"})
+# Tablas y headings en orden de documento: una sola pasada asocia cada tabla a su heading previo
+_TABLES_AND_HEADINGS = etree.XPath("//*[self::table or self::h2 or self::h3 or self::h4 or self::strong or self::span]")
 
 
-def find_block_label_for_table(table_tag) -> str:
+def node_text(el) -> str:
     """
-    Busca el rótulo del bloque (Rosario / Bahía / Mercado Local) buscando headings previos.
-    Si no encuentra, devuelve 'rosario' por defecto.
+    Equivalente a BeautifulSoup get_text(" ", strip=True) sobre un elemento lxml.
     """
-    heading = table_tag.find_previous(["h2", "h3", "h4", "strong", "span"])
-    if heading and heading.get_text(strip=True):
-        t = heading.get_text(" ", strip=True).lower()
+    return " ".join(t for t in (s.strip() for s in _TEXT_NODES(el)) if t)
+
+
+def find_block_label_for_table(heading) -> str:
+    """
+    Rótulo del bloque (Rosario / Bahía / Mercado Local) a partir del heading previo a la tabla.
+    Si no hay heading (o está vacío), devuelve 'rosario' por defecto.
+    """
+    if heading is not None:
+        t = node_text(heading).lower()
         if "rosario" in t:
             return "rosario"
         if "bahía" in t or "bahia" in t:
@@ -114,20 +149,20 @@ def find_block_label_for_table(table_tag) -> str:
     return "rosario"
 
 
-def detect_currency_from_table(table_tag) -> str:
+def detect_currency_from_table(table_el) -> str:
     """
     Detecta moneda (ARS/USD) mirando el encabezado del bloque o la tabla.
     """
     # Mirar celdas de encabezado
-    head = table_tag.find("tr", class_="head")
+    head = _HEAD_TR(table_el)
     if head:
-        txt = head.get_text(" ", strip=True).lower()
+        txt = node_text(head[0]).lower()
         if "dólares" in txt or "dolares" in txt:
             return "USD"
         if "pesos" in txt:
             return "ARS"
     # Encabezados alternativos
-    txt_table = table_tag.get_text(" ", strip=True).lower()
+    txt_table = node_text(table_el).lower()
     if "dólares" in txt_table or "dolares" in txt_table:
         return "USD"
     if "pesos" in txt_table:
@@ -145,10 +180,11 @@ def normalize_product_name(name: str) -> str:
     n = name.strip()
     # Normalización mínima
     n = n.replace("Maíz", "Maiz")
-    n = re.sub(r"\s+", " ", n)
+    n = _WS.sub(" ", n)
     return n
 
 
+@lru_cache(maxsize=8)
 def clarion_date(dt: date) -> int:
     """
     Clarion date = días desde 1800-12-28.
@@ -157,6 +193,7 @@ def clarion_date(dt: date) -> int:
     return (dt - base).days
 
 
+@lru_cache(maxsize=8)
 def mes_ejercicio(dt: date) -> Tuple[str, int]:
     """
     Devuelve ('OCT25', 2025) según fecha.
@@ -166,39 +203,80 @@ def mes_ejercicio(dt: date) -> Tuple[str, int]:
     return f"{abbr}{yy}", dt.year
 
 
-def read_site_html(url: str) -> str:
-    """
-    Descarga el HTML del sitio con httpx, con reintentos y backoff.
-    Forzamos HTTP/1.1 (http2=False) para evitar dependencia de 'h2'.
-    """
-    headers = {
+# Cliente HTTP async compartido: reusa conexiones (keep-alive) sin bloquear el event loop.
+# Forzamos HTTP/1.1 (http2=False) para evitar dependencia de 'h2'.
+_AHTTP = httpx.AsyncClient(
+    http2=False,
+    timeout=httpx.Timeout(connect=10.0, read=20.0, write=20.0, pool=5.0),
+    follow_redirects=True,
+    headers={
         "User-Agent": (
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
             "AppleWebKit/537.36 (KHTML, like Gecko) "
             "Chrome/126.0 Safari/537.36"
         ),
         "Accept": "text/html,application/xhtml+xml",
-    }
+        "Accept-Encoding": "gzip, deflate",  # httpx descomprime solo
+    },
+    # el transport reintenta los fallos de conexión sin rearmar el cliente
+    transport=httpx.AsyncHTTPTransport(
+        retries=3,
+        limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+    ),
+)
+
+
+@app.on_event("shutdown")
+async def _close_http():
+    await _AHTTP.aclose()
 
+
+async def read_site_html(url: str) -> str:
+    """
+    Descarga el HTML del sitio con el cliente compartido.
+    Los errores de conexión ya los reintenta el transport; acá solo reintentamos
+    timeouts y respuestas HTTP de error, con backoff.
+    """
     attempts = 3
     backoff = 1.6  # exponencial: 1.6^n
 
-    last_err = None
     for i in range(attempts):
         try:
-            timeout = httpx.Timeout(connect=10.0, read=20.0, write=20.0, pool=5.0)
-            with httpx.Client(http2=False, timeout=timeout, follow_redirects=True, headers=headers) as client:
-                r = client.get(url)
-                r.raise_for_status()
-                return r.text
-        except Exception as e:
-            last_err = e
-            if i < attempts - 1:
-                time.sleep(backoff ** i)
-    raise last_err
-
-
-def scrape_items(url: str) -> Dict[str, List[Dict[str, object]]]:
+            r = await _AHTTP.get(url)
+            r.raise_for_status()
+            return r.text
+        except (httpx.TimeoutException, httpx.HTTPStatusError):
+            if i == attempts - 1:
+                raise
+            await asyncio.sleep(backoff ** i)
+
+
+# Scrapes en curso por URL: los pedidos concurrentes esperan el mismo fetch (single-flight)
+_INFLIGHT: Dict[str, "asyncio.Task"] = {}
+
+# Último scrape OK por URL: { url: (vence_monotonic, all_by_plaza) }
+_SCRAPE_TTL = 120.0  # segundos
+_SCRAPED: Dict[str, Tuple[float, Dict[str, List[Dict[str, object]]]]] = {}
+
+
+async def scrape_items(url: str) -> Dict[str, List[Dict[str, object]]]:
+    """
+    Igual que _scrape_items, con cache TTL por URL; si ya hay un scrape de la misma
+    URL en curso se espera ese resultado en lugar de ir de nuevo al sitio.
+    """
+    hit = _SCRAPED.get(url)
+    if hit and hit[0] > time.monotonic():
+        return hit[1]
+    task = _INFLIGHT.get(url)
+    if task is None:
+        task = asyncio.ensure_future(_scrape_items(url))
+        _INFLIGHT[url] = task
+        task.add_done_callback(lambda _t: _INFLIGHT.pop(url, None))
+    # shield: si un cliente corta, el scrape sigue para los demás
+    return await asyncio.shield(task)
+
+
+async def _scrape_items(url: str) -> Dict[str, List[Dict[str, object]]]:
     """
     Parsea todas las tablas de la página y devuelve items agrupados por plaza.
     Estructura:
@@ -208,79 +286,70 @@ def scrape_items(url: str) -> Dict[str, List[Dict[str, object]]]:
       "locales": [...]
     }
     """
-    html = read_site_html(url)
-    soup = BeautifulSoup(html, "html.parser")
+    html = await read_site_html(url)
+    doc = lxml.html.fromstring(html)
 
     all_by_plaza: Dict[str, List[Dict[str, object]]] = {"rosario": [], "bahia": [], "locales": []}
 
-    tables = soup.find_all("table")
-    for tbl in tables:
+    # alias locales para el loop por fila (LOAD_FAST en vez de LOAD_GLOBAL)
+    text_of = node_text
+    norm = normalize_product_name
+    price = parse_price
+    labels = _ROW_LABELS
+
+    heading = None
+    for tbl in _TABLES_AND_HEADINGS(doc):
+        if tbl.tag != "table":
+            heading = tbl
+            continue
         # Algunas tablas no son cotizaciones
-        if "tabla-cotizaciones" not in (tbl.get("class") or []):
+        if "tabla-cotizaciones" not in (tbl.get("class") or "").split():
             # Si el sitio cambia clases, lo consideramos por columnas (Producto/Actual/Anterior/Var)
-            header_text = tbl.get_text(" ", strip=True).lower()
+            header_text = text_of(tbl).lower()
             if "producto" not in header_text or "anterior" not in header_text:
                 continue
 
-        plaza = find_block_label_for_table(tbl)  # rosario/bahia/locales
+        add = all_by_plaza[find_block_label_for_table(heading)].append  # rosario/bahia/locales
         moneda = detect_currency_from_table(tbl)  # ARS/USD
 
         # filas de datos
-        for tr in tbl.find_all("tr"):
+        for tr in tbl.iter("tr"):
             # saltar encabezados
-            tr_cls = (tr.get("class") or [])
+            tr_cls = (tr.get("class") or "").split()
             if "head" in tr_cls or "encabezado" in tr_cls:
                 continue
 
-            tds = tr.find_all("td")
-            if len(tds) < 3:
+            # texto de cada celda, una sola vez por fila
+            txts = [text_of(td) for td in tr.iter("td")]
+            if len(txts) < 3:
                 continue
+            last = [t for t in txts if t]
 
             # patrón de columna: [producto, (a veces col-spans), actual, anterior, var]
-            # Buscamos el primer td no vacío como producto
-            prod_td = None
-            for td in tds:
-                txt = td.get_text(" ", strip=True)
-                if txt:
-                    prod_td = td
-                    break
-            if prod_td is None:
-                continue
-
-            producto = normalize_product_name(prod_td.get_text(" ", strip=True))
-
-            # Heurística: las últimas 3 celdas suelen ser Actual, Anterior, Var
-            txts = [td.get_text(" ", strip=True) for td in tds]
-            # Intentar tomar las 3 últimas no vacías como actual, anterior, var
-            last = [t for t in txts if t != ""]
+            # El primer td no vacío es el producto; las últimas 3 suelen ser Actual, Anterior, Var
             if len(last) >= 3:
-                actual, anterior, variacion = last[-3], last[-2], last[-1]
-            else:
+                actual, anterior, variacion = last[-3:]
+            elif last and len(txts) >= 5:
                 # fallback: algunas filas con 3/4 celdas exactas
-                if len(tds) >= 5:
-                    actual = tds[-3].get_text(" ", strip=True)
-                    anterior = tds[-2].get_text(" ", strip=True)
-                    variacion = tds[-1].get_text(" ", strip=True)
-                else:
-                    # si no hay columnas completas, salteamos
-                    continue
-
-            precio = parse_price(actual)
-            anterior_txt = anterior or "s/c"
-            variacion_txt = variacion or "s/c"
+                actual, anterior, variacion = txts[-3:]
+            else:
+                # fila vacía o sin columnas completas
+                continue
 
             # Excluir filas vacías o rótulos
-            if not producto or producto.lower() in ("producto", "productos", "pesos/tn", "dólares/tn", "dolares/tn"):
+            producto = norm(last[0])
+            if not producto or producto.lower() in labels:
                 continue
 
-            all_by_plaza[plaza].append({
+            add({
                 "producto": producto,
-                "precio": precio,
+                "precio": price(actual),
                 "moneda": moneda,
-                "anterior": anterior_txt,
-                "variacion": variacion_txt,
+                "anterior": anterior or "s/c",
+                "variacion": variacion or "s/c",
             })
 
+    _SCRAPED[url] = (time.monotonic() + _SCRAPE_TTL, all_by_plaza)
     return all_by_plaza
 
 
@@ -289,43 +358,31 @@ def dedupe_and_sort(items: List[Dict[str, object]], only_base: bool = False) ->
     - Deduplica por (producto, moneda) prefiriendo precio no nulo.
     - Filtra por base si solo querés productos base.
     - Ordena por PRODUCT_ORDER, y luego USD después de ARS para el mismo producto.
+    Espera items de scrape_items (con "producto" ya normalizado).
     """
+    # "producto" ya viene normalizado desde scrape_items
+    normed = [(it["producto"], it) for it in items]
     if only_base:
-        items = [it for it in items if normalize_product_name(it["producto"]) in PRODUCTS_BASE]
+        normed = [(prod, it) for prod, it in normed if prod in PRODUCTS_BASE]
 
-    keep: Dict[Tuple[str, str], Dict[str, object]] = {}
-    for it in items:
-        key = (normalize_product_name(it["producto"]), it.get("moneda") or "")
+    keep: Dict[Tuple[str, str], Tuple[str, Dict[str, object]]] = {}
+    for prod, it in normed:
+        key = (prod, it.get("moneda") or "")
         prev = keep.get(key)
         if prev is None:
-            keep[key] = it
+            keep[key] = (prod, it)
         else:
             # si el nuevo tiene precio y el anterior no, quedate con el nuevo
-            if prev.get("precio") is None and it.get("precio") is not None:
-                keep[key] = it
+            if prev[1].get("precio") is None and it.get("precio") is not None:
+                keep[key] = (prod, it)
 
-    def sort_key(it):
-        prod = normalize_product_name(it["producto"])
-        try:
-            idx = PRODUCT_ORDER.index(prod)
-        except ValueError:
-            idx = 999
-        # ARS primero, USD después
-        mon = it.get("moneda")
-        mon_rank = 0 if mon == "ARS" else 1
-        return (idx, mon_rank, prod)
-
-    out = sorted(keep.values(), key=sort_key)
-    # Remover NaN/Inf si algo raro se coló
-    clean = []
-    for it in out:
-        p = it.get("precio")
-        if isinstance(p, float):
-            if not (p == p) or p == float("inf") or p == float("-inf"):
-                it = dict(it)
-                it["precio"] = None
-        clean.append(it)
-    return clean
+    # (rank, ARS primero / USD después, producto) -> item
+    keyed = [
+        (PRODUCT_RANK.get(prod, 999), 0 if it.get("moneda") == "ARS" else 1, prod, it)
+        for prod, it in keep.values()
+    ]
+    keyed.sort(key=itemgetter(0, 1, 2))
+    return [k[3] for k in keyed]
 
 
 # --------------------------------------------------------------------------------------
@@ -338,7 +395,7 @@ def health():
 
 
 @app.get("/api/cotizaciones")
-def api_cotizaciones(
+async def api_cotizaciones(
     plaza: str = Query("rosario"),
     only_base: int = Query(0, description="1 = solo productos base"),
     debug: int = Query(0),
@@ -351,7 +408,7 @@ def api_cotizaciones(
     dbg = {}
     try:
         t0 = time.time()
-        all_by_plaza = scrape_items(SOURCE_URL)
+        all_by_plaza = await scrape_items(SOURCE_URL)
         items = dedupe_and_sort(all_by_plaza.get(plaza, []), only_base=bool(only_base))
         # actualizar cache
         CACHE[plaza] = {"items": items, "fetched_at": datetime.now(timezone.utc).isoformat()}
@@ -365,7 +422,7 @@ def api_cotizaciones(
             dbg["scrape_ms"] = int((time.time() - t0) * 1000)
             dbg["counts"] = {k: len(v) for k, v in all_by_plaza.items()}
             payload["debug"] = dbg
-        return JSONResponse(payload)
+        return ORJSONResponse(payload)
 
     except Exception as e:
         # fallback: usar cache si disponible y no muy viejo
@@ -395,17 +452,17 @@ def api_cotizaciones(
             }
             if debug:
                 payload["debug"] = dbg
-            return JSONResponse(payload, status_code=200)
+            return ORJSONResponse(payload, status_code=200)
 
         # sin cache útil → error “vacío”
-        return JSONResponse(
+        return ORJSONResponse(
             {"items": [], "plaza": plaza, "source_url": SOURCE_URL, "error": f"{type(e).__name__}: {e}"},
             status_code=200,
         )
 
 
 @app.get("/api/csv")
-def api_csv(
+async def api_csv(
     plaza: str = Query("rosario"),
     only_base: int = Query(0),
     fallback_cache: int = Query(0, description="1 = si falla scrape, usa cache"),
@@ -414,7 +471,7 @@ def api_csv(
     if plaza not in PLAZA_CODES:
         plaza = "rosario"
     try:
-        all_by_plaza = scrape_items(SOURCE_URL)
+        all_by_plaza = await scrape_items(SOURCE_URL)
         items = dedupe_and_sort(all_by_plaza.get(plaza, []), only_base=bool(only_base))
         # actualizar cache (opcional)
         CACHE[plaza] = {"items": items, "fetched_at": datetime.now(timezone.utc).isoformat()}
@@ -426,17 +483,22 @@ def api_csv(
         else:
             items = []
 
-    # CSV en memoria
-    rows = ["producto,precio,moneda,anterior,variacion"]
-    for it in items:
-        producto = it["producto"].replace(",", " ")
-        precio = "" if it["precio"] is None else f"{it['precio']:.2f}"
-        moneda = it.get("moneda") or ""
-        anterior = (it.get("anterior") or "").replace(",", ".")
-        variacion = (it.get("variacion") or "").replace(",", ".")
-        rows.append(f"{producto},{precio},{moneda},{anterior},{variacion}")
-
-    csv_text = "\n".join(rows)
+    # CSV en memoria (csv.writer en C; comillas/saltos de línea bien escapados)
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator="\n")
+    w.writerow(("producto", "precio", "moneda", "anterior", "variacion"))
+    w.writerows(
+        (
+            it["producto"].replace(",", " "),
+            "" if it["precio"] is None else f"{it['precio']:.2f}",
+            it.get("moneda") or "",
+            (it.get("anterior") or "").replace(",", "."),
+            (it.get("variacion") or "").replace(",", "."),
+        )
+        for it in items
+    )
+
+    csv_text = buf.getvalue()
     filename = f"cotizaciones_{plaza}.csv"
     headers = {
         "Content-Type": "text/csv",
@@ -445,46 +507,112 @@ def api_csv(
     return PlainTextResponse(csv_text, headers=headers)
 
 
-@app.get("/api/health/oracle")
-def api_health_oracle():
-    try:
-        _ = os.environ.get("ORACLE_CLIENT_LIB_DIR")
-        # Intentar init en thick; si ya se inicializó, oracledb lanza excepción: la ignoramos.
+# --- Oracle: init del cliente una sola vez + pool de sesiones reutilizables ---
+_ORACLE_LOCK = threading.Lock()
+_ORACLE_INIT_DONE = False
+_POOL = None
+
+
+def _oracle_creds() -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    dsn = os.environ.get("ORACLE_DSN")
+    user = os.environ.get("ORACLE_USER")
+    pwd = os.environ.get("ORACLE_PASSWORD") or os.environ.get("ORACLE_PASS")
+    return dsn, user, pwd
+
+
+def _init_oracle_client() -> None:
+    """
+    Intenta modo thick una sola vez por proceso; si no hay Instant Client queda en thin.
+    """
+    global _ORACLE_INIT_DONE
+    if _ORACLE_INIT_DONE:
+        return
+    with _ORACLE_LOCK:
+        if _ORACLE_INIT_DONE:
+            return
+        libdir = os.environ.get("ORACLE_CLIENT_LIB_DIR")
         try:
-            if _:
-                oracledb.init_oracle_client(lib_dir=_)
+            if libdir:
+                oracledb.init_oracle_client(lib_dir=libdir)
             else:
                 oracledb.init_oracle_client()  # buscará en rutas conocidas
         except Exception:
             pass
+        _ORACLE_INIT_DONE = True
+
+
+def _get_pool():
+    """
+    Pool creado la primera vez que se necesita (auth + sesión se pagan una sola vez).
+    """
+    global _POOL
+    if _POOL is not None:
+        return _POOL
+    dsn, user, pwd = _oracle_creds()
+    assert dsn and user and pwd, "Faltan ORACLE_DSN / ORACLE_USER / ORACLE_PASSWORD"
+    _init_oracle_client()
+    with _ORACLE_LOCK:
+        if _POOL is None:
+            _POOL = oracledb.create_pool(user=user, password=pwd, dsn=dsn, min=1, max=4, increment=1)
+    return _POOL
+
+
+def _warm_pool_quietly():
+    # sin credenciales (o sin Oracle alcanzable) la API igual levanta
+    try:
+        _get_pool()
+    except Exception:
+        pass
+
+
+@app.on_event("startup")
+async def _warm_oracle_pool():
+    # en un hilo aparte y sin esperarlo: si Oracle no responde, el arranque
+    # no queda bloqueado hasta el timeout de conexión
+    asyncio.get_running_loop().run_in_executor(None, _warm_pool_quietly)
+
 
-        dsn = os.environ.get("ORACLE_DSN")
-        user = os.environ.get("ORACLE_USER")
-        pwd = os.environ.get("ORACLE_PASSWORD") or os.environ.get("ORACLE_PASS")
+@app.on_event("shutdown")
+def _close_oracle_pool():
+    global _POOL
+    if _POOL is not None:
+        try:
+            _POOL.close(force=True)
+        except Exception:
+            pass
+        _POOL = None
 
-        assert dsn and user and pwd, "Faltan ORACLE_DSN / ORACLE_USER / ORACLE_PASSWORD"
 
-        with oracledb.connect(user=user, password=pwd, dsn=dsn, encoding="UTF-8") as con:
+@app.get("/api/health/oracle")
+def api_health_oracle():
+    try:
+        with _get_pool().acquire() as con:
             cur = con.cursor()
             cur.execute("select 1 from dual")
             val = cur.fetchone()[0]
-        return {"ok": True, "mode": "thick", "ping": int(val)}
+        return {"ok": True, "mode": "thin" if oracledb.is_thin_mode() else "thick", "ping": int(val)}
     except Exception as e:
         return {"ok": False, "oracle_disabled": True, "reason": f"{type(e).__name__}: {e}"}
 
 
-def build_oracle_rows(plaza: str, only_base: bool) -> List[Dict[str, object]]:
+async def build_oracle_rows(
+    plaza: str,
+    only_base: bool,
+    all_by_plaza: Optional[Dict[str, List[Dict[str, object]]]] = None,
+) -> List[Dict[str, object]]:
     """
     Convierte cotizaciones (filtradas/deduplicadas) a filas Oracle TB_REF.
     Regla: preferimos ARS; si un producto base no tiene ARS, y sólo hay USD, lo incluimos tal cual.
+    Si el llamador ya tiene el scrape lo pasa en all_by_plaza; si no, sale del cache TTL.
     """
-    all_by_plaza = scrape_items(SOURCE_URL)
+    if all_by_plaza is None:
+        all_by_plaza = await scrape_items(SOURCE_URL)
     raw = dedupe_and_sort(all_by_plaza.get(plaza, []), only_base=only_base)
 
     # Preferencia ARS sobre USD: agrupamos por producto
     by_prod: Dict[str, Dict[str, object]] = {}
     for it in raw:
-        prod = normalize_product_name(it["producto"])
+        prod = it["producto"]  # ya normalizado en scrape_items
         if prod not in PRODUCTS_BASE:
             continue
         cur = it.get("moneda")
@@ -532,19 +660,21 @@ def build_oracle_rows(plaza: str, only_base: bool) -> List[Dict[str, object]]:
 
 
 @app.get("/api/export/oracle/preview")
-def api_export_preview(plaza: str = Query("rosario"), only_base: int = Query(1)):
+async def api_export_preview(plaza: str = Query("rosario"), only_base: int = Query(1)):
     plaza = plaza.lower().strip()
     if plaza not in PLAZA_CODES:
         plaza = "rosario"
     try:
-        rows = build_oracle_rows(plaza, only_base=bool(only_base))
+        # un solo scrape por request, que build_oracle_rows reutiliza
+        all_by_plaza = await scrape_items(SOURCE_URL)
+        rows = await build_oracle_rows(plaza, only_base=bool(only_base), all_by_plaza=all_by_plaza)
         return {"plaza": plaza, "count": len(rows), "rows": rows}
     except Exception as e:
-        return JSONResponse({"plaza": plaza, "count": 0, "error": f"{type(e).__name__}: {e}"}, status_code=200)
+        return ORJSONResponse({"plaza": plaza, "count": 0, "error": f"{type(e).__name__}: {e}"}, status_code=200)
 
 
 @app.post("/api/export/oracle")
-def api_export_oracle(
+async def api_export_oracle(
     plaza: str = Query("rosario"),
     only_base: int = Query(1),
     overwrite: int = Query(0),
@@ -553,61 +683,64 @@ def api_export_oracle(
     if plaza not in PLAZA_CODES:
         plaza = "rosario"
     try:
-        rows = build_oracle_rows(plaza, only_base=bool(only_base))
+        # un solo scrape por request, que build_oracle_rows reutiliza
+        all_by_plaza = await scrape_items(SOURCE_URL)
+        rows = await build_oracle_rows(plaza, only_base=bool(only_base), all_by_plaza=all_by_plaza)
         if not rows:
             return {"ok": False, "exported": 0, "plaza": plaza, "reason": "No hay filas exportables"}
 
-        dsn = os.environ.get("ORACLE_DSN")
-        user = os.environ.get("ORACLE_USER")
-        pwd = os.environ.get("ORACLE_PASSWORD") or os.environ.get("ORACLE_PASS")
+        dsn, user, pwd = _oracle_creds()
         if not (dsn and user and pwd):
             return {"ok": False, "exported": 0, "plaza": plaza, "oracle_disabled": True, "reason": "Credenciales Oracle no configuradas"}
 
-        # Init thick (si aplica)
-        try:
-            libdir = os.environ.get("ORACLE_CLIENT_LIB_DIR")
-            if libdir:
-                oracledb.init_oracle_client(lib_dir=libdir)
-        except Exception:
-            pass
-
-        with oracledb.connect(user=user, password=pwd, dsn=dsn, encoding="UTF-8") as con:
-            cur = con.cursor()
-
-            if overwrite:
-                # Borrar por llave “del día” y pizarra
-                pizarra = rows[0]["PIZARRA"]
-                fechavig = rows[0]["FECHAVIG"]
-                mes = rows[0]["MES"]
-                ejercicio = rows[0]["EJERCICIO"]
-                cur.execute(
+        # Oracle es bloqueante: corre en el threadpool para no frenar el event loop
+        def _write():
+            with _get_pool().acquire() as con:
+                cur = con.cursor()
+
+                if overwrite:
+                    # Borrar por llave “del día” y pizarra
+                    pizarra = rows[0]["PIZARRA"]
+                    fechavig = rows[0]["FECHAVIG"]
+                    mes = rows[0]["MES"]
+                    ejercicio = rows[0]["EJERCICIO"]
+                    cur.execute(
+                        """
+                        DELETE FROM TEST_EMAN.TB_REF
+                         WHERE PIZARRA = :p
+                           AND FECHAVIG = :fv
+                           AND MES = :m
+                           AND EJERCICIO = :e
+                        """,
+                        p=pizarra, fv=fechavig, m=mes, e=ejercicio
+                    )
+
+                # Insert batch
+                data = [
+                    (
+                        r["GRANO"], r["SIGLO"], r["COSECHA"], r["PIZARRA"],
+                        r["FECHAVIG"], r["MES"], r["EJERCICIO"], r["PRECIOREF"], r["UVALUE"]
+                    )
+                    for r in rows
+                ]
+                # Tipos fijos por posición: array bind en un solo round-trip
+                cur.setinputsizes(int, int, 4, 3, oracledb.DB_TYPE_NUMBER, 5, int, float, int)
+                cur.executemany(
                     """
-                    DELETE FROM TEST_EMAN.TB_REF
-                     WHERE PIZARRA = :p
-                       AND FECHAVIG = :fv
-                       AND MES = :m
-                       AND EJERCICIO = :e
+                    INSERT INTO TEST_EMAN.TB_REF
+                    (GRANO, SIGLO, COSECHA, PIZARRA, FECHAVIG, MES, EJERCICIO, PRECIOREF, UVALUE)
+                    VALUES (:1, :2, :3, :4, :5, :6, :7, :8, :9)
                     """,
-                    p=pizarra, fv=fechavig, m=mes, e=ejercicio
+                    data,
+                    batcherrors=True,
                 )
+                errors = [f"fila {e.offset}: {e.message}" for e in cur.getbatcherrors()]
+                con.commit()
+                return errors
 
-            # Insert batch
-            data = [
-                (
-                    r["GRANO"], r["SIGLO"], r["COSECHA"], r["PIZARRA"],
-                    r["FECHAVIG"], r["MES"], r["EJERCICIO"], r["PRECIOREF"], r["UVALUE"]
-                )
-                for r in rows
-            ]
-            cur.executemany(
-                """
-                INSERT INTO TEST_EMAN.TB_REF
-                (GRANO, SIGLO, COSECHA, PIZARRA, FECHAVIG, MES, EJERCICIO, PRECIOREF, UVALUE)
-                VALUES (:1, :2, :3, :4, :5, :6, :7, :8, :9)
-                """,
-                data
-            )
-            con.commit()
+        errors = await run_in_threadpool(_write)
+        if errors:
+            return {"ok": False, "exported": len(rows) - len(errors), "plaza": plaza, "errors": errors}
         return {"ok": True, "exported": len(rows), "plaza": plaza}
     except oracledb.Error as dbex:
         return {"ok": False, "exported": 0, "plaza": plaza, "error": str(dbex)}
@@ -647,4 +780,12 @@ def api_cache_status():
             "fetched_at": CACHE[plaza]["fetched_at"],
         }
         for plaza in CACHE.keys()
-    }
\ No newline at end of file
+    }
+
+
+@app.post("/api/cache/invalidate")
+def api_cache_invalidate():
+    # Fuerza a que el próximo pedido vuelva a scrapear el sitio (el fallback por plaza se mantiene)
+    n = len(_SCRAPED)
+    _SCRAPED.clear()
+    return {"ok": True, "invalidated": n}
@@ -1,5 +1,5 @@
 # main.py
-# API de pizarras (FastAPI) sin Playwright: requests + regex, cache simple en memoria.
+# API de pizarras (FastAPI) sin Playwright: requests + lxml, cache simple en memoria.
 # Endpoints:
 #   - GET /api/health
 #   - GET /api/cotizaciones?plaza=rosario|bahia|locales&only_base=1
@@ -7,10 +7,14 @@
 
 from fastapi import FastAPI, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from typing import Dict, Any, List, Optional, Tuple
 import requests
-import re
 import time
+from functools import lru_cache
+import threading
+import lxml.html
+from lxml import etree
 
 APP_TITLE = "Pizarras Granos API"
 SOURCE_URL = "https://www.bolsadecereales.com/camara-arbitral"
@@ -24,11 +28,14 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# JSON comprimido para los clientes (las respuestas chicas van sin comprimir)
+app.add_middleware(GZipMiddleware, minimum_size=500)
 
 # ---------------------------
 # Utilidades
 # ---------------------------
 
+@lru_cache(maxsize=32)
 def normalize_plaza(p: str) -> Tuple[str, str]:
     """
     Devuelve (plaza_normalizada, etiqueta_busqueda) donde etiqueta es el texto tal como
@@ -45,17 +52,22 @@ def normalize_plaza(p: str) -> Tuple[str, str]:
     return "rosario", "Rosario"
 
 
+# Sesión HTTP compartida: reusa la conexión TCP/TLS entre scrapes
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/126.0.0.0 Safari/537.36"
+    ),
+    "Accept-Language": "es-AR,es;q=0.9",
+    "Cache-Control": "no-cache",
+    "Accept-Encoding": "gzip, deflate",  # requests descomprime solo
+})
+
+
 def fetch_html(url: str, timeout: int = 25) -> str:
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/126.0.0.0 Safari/537.36"
-        ),
-        "Accept-Language": "es-AR,es;q=0.9",
-        "Cache-Control": "no-cache",
-    }
-    resp = requests.get(url, headers=headers, timeout=timeout)
+    resp = _SESSION.get(url, timeout=timeout)
     resp.raise_for_status()
     return resp.text
 
@@ -78,33 +90,31 @@ _CACHE: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
 _CACHE_TTL = 120.0  # segundos
 
 
-def _extract_table_block(html: str, titulo_text: str) -> str:
+# XPath precompiladas: todo el recorrido del DOM queda en C (lxml)
+_TITULOS = etree.XPath("//div[contains(@class, 'titulo-tabla')]")
+_TABLA_SIGUIENTE = etree.XPath("following::table[contains(@class, 'tabla-cotizaciones')][1]")
+_FILAS = etree.XPath(".//tr[not(contains(@class, 'head')) and not(contains(@class, 'encabezado'))]")
+_CELDAS = etree.XPath("./td")
+
+
+def _find_plaza_table(doc, titulo_text: str):
     """
-    Extrae la PRIMERA tabla de cotizaciones posterior al título de la plaza.
-    Usamos IGNORECASE vía flags, y NO metemos (?i) dentro del patrón.
+    Devuelve la PRIMERA tabla de cotizaciones posterior al título de la plaza (o None).
+    El título se compara sin distinguir mayúsculas.
     """
-    # 1) localizar el título
-    m = re.search(
-        rf'<div[^>]*class="[^"]*titulo-tabla[^"]*"[^>]*>\s*{re.escape(titulo_text)}\s*</div>',
-        html,
-        flags=re.IGNORECASE | re.DOTALL,
-    )
-    if not m:
-        return ""
-    start = m.end()
-
-    # 2) desde allí, tomar la primera tabla de cotizaciones
-    mtab = re.search(
-        r'<table[^>]*class="[^"]*tabla-cotizaciones[^"]*"[^>]*>(.*?)</table>',
-        html[start:],
-        flags=re.IGNORECASE | re.DOTALL,
-    )
-    if not mtab:
-        return ""
-    return mtab.group(1)
-
-
-def parse_items_from_block(block_html: str) -> List[Dict[str, Any]]:
+    buscado = titulo_text.lower()
+    for titulo in _TITULOS(doc):
+        if titulo.text_content().strip().lower() == buscado:
+            tablas = _TABLA_SIGUIENTE(titulo)
+            return tablas[0] if tablas else None
+    return None
+
+
+def _cell_text(td) -> str:
+    return td.text_content().strip()
+
+
+def parse_items_from_table(tbl) -> List[Dict[str, Any]]:
     """
     Parsea filas con estructura:
       <td colspan="2">Producto</td> <td>Actual</td> <td>Anterior</td> <td>Var</td>
@@ -112,27 +122,20 @@ def parse_items_from_block(block_html: str) -> List[Dict[str, Any]]:
     """
     items: List[Dict[str, Any]] = []
 
-    for row in re.findall(r"<tr[^>]*>(.*?)</tr>", block_html, flags=re.IGNORECASE | re.DOTALL):
-        # Ignorar encabezados
-        if re.search(r'class="[^"]*(head|encabezado)[^"]*"', row, flags=re.IGNORECASE):
-            continue
-
-        tds = re.findall(r"<td[^>]*>(.*?)</td>", row, flags=re.IGNORECASE | re.DOTALL)
+    # Ignorar encabezados (el XPath ya descarta tr.head / tr.encabezado)
+    for row in _FILAS(tbl):
+        tds = _CELDAS(row)
         if len(tds) < 2:
             continue
 
-        def _strip_html(x: str) -> str:
-            x = re.sub(r"<[^>]+>", "", x)
-            return x.strip()
-
-        producto = _strip_html(tds[0])
+        producto = _cell_text(tds[0])
         if not producto or producto.lower() in ("producto", "pesos/tn", "dólares/tn", "dolares/tn"):
             continue
 
         # “Actual” debería ser tds[1]; si viene vacío y hay más celdas, probamos la siguiente.
-        actual = _strip_html(tds[1]) if len(tds) >= 2 else ""
+        actual = _cell_text(tds[1]) if len(tds) >= 2 else ""
         if (actual == "" or _clean_num(actual) is None) and len(tds) >= 3:
-            actual = _strip_html(tds[2])
+            actual = _cell_text(tds[2])
 
         precio = _clean_num(actual)
 
@@ -153,11 +156,11 @@ def scrape_plaza(plaza_norm: str) -> List[Dict[str, Any]]:
 
     html = fetch_html(SOURCE_URL)
     titulo_text = "Rosario" if plaza_norm == "rosario" else "Bahía Blanca"
-    block = _extract_table_block(html, titulo_text)
-    if not block:
+    tbl = _find_plaza_table(lxml.html.fromstring(html), titulo_text)
+    if tbl is None:
         return []
 
-    items = parse_items_from_block(block)
+    items = parse_items_from_table(tbl)
 
     # normalización simple de nombres
     rename = {
@@ -190,6 +193,10 @@ def set_cached(plaza_norm: str, data: List[Dict[str, Any]]) -> None:
     _CACHE[plaza_norm] = (time.time(), data)
 
 
+# Un lock por plaza: pedidos concurrentes con el cache vencido hacen UN solo scrape
+_SCRAPE_LOCKS = {p: threading.Lock() for p in ("rosario", "bahia", "locales")}
+
+
 # ---------------------------
 # Endpoints
 # ---------------------------
@@ -211,8 +218,13 @@ def cotizaciones(
         return {"items": cached, "plaza": plaza_norm, "source_url": SOURCE_URL, "cached": True}
 
     try:
-        items = scrape_plaza(plaza_norm)
-        set_cached(plaza_norm, items)
+        with _SCRAPE_LOCKS[plaza_norm]:
+            # otro pedido pudo haber cargado el cache mientras esperábamos el lock
+            cached = get_cached(plaza_norm)
+            if cached is not None:
+                return {"items": cached, "plaza": plaza_norm, "source_url": SOURCE_URL, "cached": True}
+            items = scrape_plaza(plaza_norm)
+            set_cached(plaza_norm, items)
         return {"items": items, "plaza": plaza_norm, "source_url": SOURCE_URL, "cached": False}
     except requests.Timeout:
         return {
@@ -1,21 +1,27 @@
 # backend/main.py
-# API de pizarras (FastAPI) usando requests + regex, cache simple en memoria.
+# API de pizarras (FastAPI) usando requests + lxml, cache simple en memoria.
 # Endpoints:
 #   - GET /api/health
 #   - GET /api/cotizaciones?plaza=rosario|bahia|locales&only_base=1
-# Sin dependencias nuevas. Compatible con Docker (puerto 8000/8001 según compose).
+# Requiere orjson (ORJSONResponse); brotli es opcional (Accept-Encoding br si está).
+# Compatible con Docker (puerto 8000/8001 según compose).
 
 from fastapi import FastAPI, Query
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Dict, Any, List, Optional, Tuple
+from fastapi.responses import ORJSONResponse
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+import io
 import requests
-import re
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
+from lxml import etree
 
 APP_TITLE = "Pizarras Granos API"
 SOURCE_URL = "https://www.bolsadecereales.com/camara-arbitral"
 
-app = FastAPI(title=APP_TITLE)
+# orjson serializa la lista de items en Rust (el costo dominante en hits de cache)
+app = FastAPI(title=APP_TITLE, default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -29,32 +35,57 @@ app.add_middleware(
 # Utilidades
 # ---------------------------
 
+# (plaza_normalizada, etiqueta_titulo, alias): se aplana una vez al importar en _ALIAS,
+# con las formas acentuadas ya incluidas (este módulo no saca acentos).
+_PLAZAS = (
+    ("rosario", "Rosario", ("rosario", "ros", "ros-spot")),
+    ("bahia", "Bahía Blanca", ("bahia", "bahía", "bahia blanca", "bahía blanca", "bbca", "bb")),
+    ("locales", "Locales", ("loc", "local", "locales", "mercado local")),  # hoy sin bloque estable
+)
+_ALIAS: Dict[str, Tuple[str, str]] = {
+    alias: (norm, label) for norm, label, aliases in _PLAZAS for alias in aliases
+}
+
+
 def normalize_plaza(p: str) -> Tuple[str, str]:
     """
     Devuelve (plaza_normalizada, etiqueta_titulo) donde etiqueta es el texto tal como
     aparece en el HTML para localizar el bloque.
     """
-    p = (p or "").strip().lower()
-    if p in ("rosario", "ros", "ros-spot"):
-        return "rosario", "Rosario"
-    if p in ("bahia", "bahía", "bahia blanca", "bahía blanca", "bbca", "bb"):
-        return "bahia", "Bahía Blanca"
-    if p in ("loc", "local", "locales", "mercado local"):
-        return "locales", "Locales"  # hoy sin bloque estable
-    return "rosario", "Rosario"
+    return _ALIAS.get((p or "").strip().lower(), ("rosario", "Rosario"))
+
+
+# br solo si está 'brotli' (es lo que usa requests para descomprimirlo); si no, gzip
+try:
+    import brotli  # noqa: F401
+    _ACCEPT_ENCODING = "gzip, br, deflate"
+except ImportError:
+    _ACCEPT_ENCODING = "gzip, deflate"
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/126.0.0.0 Safari/537.36"
+    ),
+    "Accept-Language": "es-AR,es;q=0.9",
+    "Cache-Control": "no-cache",
+    "Accept-Encoding": _ACCEPT_ENCODING,  # requests descomprime solo
+}
+
+# Sesión compartida: keep-alive + pool HTTPS (sin handshake TCP/TLS por scrape)
+# y reintento corto ante 502/503/504 del sitio.
+_SESSION = requests.Session()
+_SESSION.headers.update(HEADERS)
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+))
 
 
 def fetch_html(url: str, timeout: int = 25) -> str:
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/126.0.0.0 Safari/537.36"
-        ),
-        "Accept-Language": "es-AR,es;q=0.9",
-        "Cache-Control": "no-cache",
-    }
-    resp = requests.get(url, headers=headers, timeout=timeout)
+    resp = _SESSION.get(url, timeout=timeout)
     resp.raise_for_status()
     return resp.text
 
@@ -77,45 +108,57 @@ _CACHE: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
 _CACHE_TTL = 120.0  # segundos
 
 
-def _slice_plaza_section(html: str, titulo_text: str) -> str:
-    """
-    Recorta el HTML desde <div class="titulo-tabla">titulo_text</div>
-    hasta el próximo título de plaza, para no “comernos” tablas de otras plazas.
-    """
-    m = re.search(
-        rf'<div[^>]*class="[^"]*titulo-tabla[^"]*"[^>]*>\s*{re.escape(titulo_text)}\s*</div>',
-        html,
-        flags=re.IGNORECASE | re.DOTALL,
-    )
-    if not m:
-        return ""
-    start = m.end()
-    # buscar el siguiente título (ROSARIO / QUEQUÉN / BAHÍA BLANCA / etc.)
-    mnext = re.search(
-        r'<div[^>]*class="[^"]*titulo-tabla[^"]*"[^>]*>\s*([A-ZÁÉÍÓÚÑ][^<]*)</div>',
-        html[start:],
-        flags=re.IGNORECASE | re.DOTALL,
-    )
-    if mnext:
-        end = start + mnext.start()
-        return html[start:end]
-    return html[start:]
+# XPath precompiladas para filas/celdas de cada tabla
+_X_ROWS = etree.XPath(".//tr[not(contains(@class, 'head')) and not(contains(@class, 'encabezado'))]")
+_X_TDS = etree.XPath("./td")
 
 
-def _extract_tables(block_html: str) -> List[str]:
+def _plaza_tables(html: str, titulo_text: str) -> Iterator[Any]:
     """
-    Devuelve TODAS las tablas de cotizaciones dentro del bloque (en orden).
+    Recorre la página en streaming (iterparse) y va entregando las tablas de cotizaciones
+    entre <div class="titulo-tabla">titulo_text</div> y el próximo título de plaza (en orden),
+    para no “comernos” tablas de otras plazas. Lo ya recorrido se libera y se corta al
+    llegar al título siguiente, así no se arma el DOM entero.
     En Bahía normalmente vienen 2: Pesos/TN y Dólares/TN.
     En Rosario: 1 (Pesos/TN).
     """
-    return re.findall(
-        r'<table[^>]*class="[^"]*tabla-cotizaciones[^"]*"[^>]*>(.*?)</table>',
-        block_html,
-        flags=re.IGNORECASE | re.DOTALL,
+    wanted = titulo_text.lower()
+    inside = False
+    ctx = etree.iterparse(
+        io.BytesIO(html.encode("utf-8")), events=("end",), tag=("div", "table"),
+        html=True, encoding="utf-8",
     )
-
-
-def parse_items_from_table(table_html: str, currency: str) -> List[Dict[str, Any]]:
+    for _, el in ctx:
+        cls = el.get("class") or ""
+        if el.tag == "div" and "titulo-tabla" in cls:
+            if inside:
+                break  # siguiente título (ROSARIO / QUEQUÉN / BAHÍA BLANCA / etc.)
+            inside = "".join(el.itertext()).strip().lower() == wanted
+        elif el.tag == "table" and inside and "tabla-cotizaciones" in cls:
+            yield el
+        # liberar el subárbol ya procesado y los hermanos anteriores
+        el.clear()
+        while el.getprevious() is not None:
+            del el.getparent()[0]
+
+
+def _cell_text(td) -> str:
+    return "".join(td.itertext()).strip()
+
+
+# Normalización de nombres (clave: producto en minúscula)
+RENAME = {
+    "trigo": "Trigo",
+    "maiz": "Maiz",
+    "maíz": "Maiz",
+    "soja": "Soja",
+    "sorgo": "Sorgo",
+    "girasol": "Girasol",
+    "trigo art 12": "Trigo Art 12",
+}
+
+
+def parse_items_from_table(tbl, currency: str) -> List[Dict[str, Any]]:
     """
     Parsea filas con estructura:
       <td colspan="2">Producto</td> <td>Actual</td> <td>Anterior</td> <td>Var</td>
@@ -123,31 +166,24 @@ def parse_items_from_table(table_html: str, currency: str) -> List[Dict[str, Any
     """
     items: List[Dict[str, Any]] = []
 
-    for row in re.findall(r"<tr[^>]*>(.*?)</tr>", table_html, flags=re.IGNORECASE | re.DOTALL):
-        # Ignorar encabezados
-        if re.search(r'class="[^"]*(head|encabezado)[^"]*"', row, flags=re.IGNORECASE):
-            continue
-
-        tds = re.findall(r"<td[^>]*>(.*?)</td>", row, flags=re.IGNORECASE | re.DOTALL)
+    # Ignorar encabezados (el XPath ya descarta tr.head / tr.encabezado)
+    for row in _X_ROWS(tbl):
+        tds = _X_TDS(row)
         if len(tds) < 2:
             continue
 
-        def _strip_html(x: str) -> str:
-            x = re.sub(r"<[^>]+>", "", x)
-            return x.strip()
-
-        producto = _strip_html(tds[0])
+        producto = _cell_text(tds[0])
         if not producto or producto.lower() in ("producto", "pesos/tn", "dólares/tn", "dolares/tn"):
             continue
 
-        actual = _strip_html(tds[1]) if len(tds) >= 2 else ""
+        actual = _cell_text(tds[1]) if len(tds) >= 2 else ""
         if (actual == "" or _clean_num(actual) is None) and len(tds) >= 3:
-            actual = _strip_html(tds[2])
+            actual = _cell_text(tds[2])
 
         precio = _clean_num(actual)
 
         items.append({
-            "producto": producto,
+            "producto": RENAME.get(producto.lower(), producto),
             "precio": precio,
             "moneda": currency,
             "anterior": "s/c",
@@ -164,36 +200,13 @@ def scrape_plaza(plaza_norm: str) -> List[Dict[str, Any]]:
     html = fetch_html(SOURCE_URL)
     titulo_text = "Rosario" if plaza_norm == "rosario" else "Bahía Blanca"
 
-    section = _slice_plaza_section(html, titulo_text)
-    if not section:
-        return []
-
-    tables = _extract_tables(section)
-    if not tables:
-        return []
-
     items: List[Dict[str, Any]] = []
     # En orden: 0 = Pesos/TN (ARS), 1 = Dólares/TN (USD) si existe
-    if len(tables) >= 1:
-        items += parse_items_from_table(tables[0], "ARS")
-    if len(tables) >= 2:
-        items += parse_items_from_table(tables[1], "USD")
-
-    # normalización de nombres para mantener consistencia
-    rename = {
-        "trigo": "Trigo",
-        "maiz": "Maiz",
-        "maíz": "Maiz",
-        "soja": "Soja",
-        "sorgo": "Sorgo",
-        "girasol": "Girasol",
-        "trigo art 12": "Trigo Art 12",
-    }
-    norm_items: List[Dict[str, Any]] = []
-    for it in items:
-        key = rename.get(it["producto"].strip().lower(), it["producto"].strip())
-        norm_items.append({**it, "producto": key})
-    return norm_items
+    for idx, tbl in enumerate(_plaza_tables(html, titulo_text)):
+        items += parse_items_from_table(tbl, "ARS" if idx == 0 else "USD")
+        if idx == 1:
+            break
+    return items
 
 
 def get_cached(plaza_norm: str) -> Optional[List[Dict[str, Any]]]:
@@ -1,5 +1,5 @@
 # backend/main.py
-# API de pizarras (FastAPI) usando requests + BeautifulSoup, cache simple en memoria.
+# API de pizarras (FastAPI) usando httpx (async) + lxml, cache simple en memoria.
 # Endpoints:
 #   - GET /api/health
 #   - GET /api/cotizaciones?plaza=rosario|bahia|cordoba|quequen|darsena|locales&only_base=1
@@ -7,17 +7,22 @@
 
 from fastapi import FastAPI, Query
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Dict, Any, List, Optional, Tuple
-import requests
+from fastapi.responses import ORJSONResponse
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+import asyncio
+import httpx
 import re
 import time
 import unicodedata
-from bs4 import BeautifulSoup
+from functools import lru_cache
+import lxml.html
+from lxml import etree
 
 APP_TITLE = "Pizarras Granos API"
 SOURCE_URL = "https://www.bolsadecereales.com/camara-arbitral"
 
-app = FastAPI(title=APP_TITLE)
+# orjson serializa la lista de items en Rust (el costo dominante en hits de cache)
+app = FastAPI(title=APP_TITLE, default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -31,60 +36,108 @@ app.add_middleware(
 # Utilidades
 # ---------------------------
 
+@lru_cache(maxsize=256)
 def _strip_accents(s: str) -> str:
-    if not isinstance(s, str):
+    # ASCII puro (títulos, alias, la mayoría de las celdas): no hay acentos que sacar
+    if not isinstance(s, str) or s.isascii():
         return s
     return "".join(c for c in unicodedata.normalize("NFD", s) if unicodedata.category(c) != "Mn")
 
+# alias (minúscula, sin acentos) -> (plaza_normalizada, etiqueta_titulo)
+_PLAZA_MAP: Dict[str, Tuple[str, str]] = {
+    **dict.fromkeys(("rosario", "ros", "ros-spot"), ("rosario", "Rosario")),
+    **dict.fromkeys(("bahia", "bahia blanca", "bbca", "bb", "bahia-blanca", "bahia_blanca"), ("bahia", "Bahía Blanca")),
+    **dict.fromkeys(("cordoba", "cba", "cor", "cb"), ("cordoba", "Córdoba")),
+    **dict.fromkeys(("quequen", "qqn", "que"), ("quequen", "Quequén")),
+    **dict.fromkeys(("darsena", "dar"), ("darsena", "Dársena")),
+    **dict.fromkeys(("locales", "local", "loc", "mercado local", "mercadolocal"), ("locales", "Locales")),
+}
+
+@lru_cache(maxsize=64)
 def normalize_plaza(p: str) -> Tuple[str, str]:
     """
     Devuelve (plaza_normalizada, etiqueta_titulo) tal como aparece en el HTML:
     "Rosario", "Bahía Blanca", "Córdoba", "Quequén", "Dársena".
+    Alias desconocidos: default conservador Rosario.
     """
-    p_in = (p or "").strip().lower()
-    p_na = _strip_accents(p_in)
-
-    # Rosario
-    if p_in in ("rosario", "ros", "ros-spot"):
-        return "rosario", "Rosario"
-
-    # Bahía Blanca
-    if p_na in ("bahia", "bahia blanca", "bbca", "bb", "bahia-blanca", "bahia_blanca"):
-        return "bahia", "Bahía Blanca"
-
-    # Córdoba
-    if p_na in ("cordoba", "cba", "cor", "cb"):
-        return "cordoba", "Córdoba"
-
-    # Quequén
-    if p_na in ("quequen", "qqn", "que"):
-        return "quequen", "Quequén"
-
-    # Dársena
-    if p_na in ("darsena", "dar"):
-        return "darsena", "Dársena"
-
-    # Locales (sin bloque estable en fuente)
-    if p_na in ("locales", "local", "loc", "mercado local", "mercadolocal"):
-        return "locales", "Locales"
-
-    # Default conservador
-    return "rosario", "Rosario"
-
-
-def fetch_html(url: str, timeout: int = 25) -> str:
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/126.0.0.0 Safari/537.36"
-        ),
-        "Accept-Language": "es-AR,es;q=0.9",
-        "Cache-Control": "no-cache",
-    }
-    resp = requests.get(url, headers=headers, timeout=timeout)
-    resp.raise_for_status()
-    return resp.text
+    p_na = _strip_accents((p or "").strip().lower())
+    return _PLAZA_MAP.get(p_na, ("rosario", "Rosario"))
+
+
+# br solo si está 'brotli' (es lo que usa httpx para descomprimirlo); si no, gzip
+try:
+    import brotli  # noqa: F401
+    _ACCEPT_ENCODING = "gzip, br, deflate"
+except ImportError:
+    _ACCEPT_ENCODING = "gzip, deflate"
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/126.0.0.0 Safari/537.36"
+    ),
+    "Accept-Language": "es-AR,es;q=0.9",
+    "Cache-Control": "no-cache",
+    "Accept-Encoding": _ACCEPT_ENCODING,  # httpx descomprime solo
+}
+
+# Cliente async compartido (keep-alive); se crea en startup y se cierra en shutdown.
+# HTTP/1.1: http2 pediría el paquete 'h2', que no está en requirements.
+_CLIENT: Optional[httpx.AsyncClient] = None
+# Tarea de refresco en segundo plano (ver _refresh_loop)
+_REFRESH_TASK: Optional["asyncio.Task"] = None
+
+
+@app.on_event("startup")
+async def _open_client() -> None:
+    global _CLIENT
+    _CLIENT = httpx.AsyncClient(
+        headers=HEADERS,
+        timeout=httpx.Timeout(25.0),
+        limits=httpx.Limits(max_keepalive_connections=4, max_connections=4),
+    )
+    global _REFRESH_TASK
+    _REFRESH_TASK = asyncio.create_task(_refresh_loop())
+
+
+@app.on_event("shutdown")
+async def _close_client() -> None:
+    if _REFRESH_TASK is not None:
+        _REFRESH_TASK.cancel()
+    if _CLIENT is not None:
+        await _CLIENT.aclose()
+
+
+# Tope de pedidos simultáneos al sitio por proceso (refresh en background + endpoint),
+# para no saturar ni hacernos bloquear por bolsadecereales.com
+_FETCH_SEM = asyncio.Semaphore(2)
+
+
+async def fetch_page(url: str, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+    # mientras esperamos al sitio, el event loop atiende otros pedidos.
+    # No levanta en 304: lo resuelve _refresh_doc.
+    async with _FETCH_SEM:
+        r = await _CLIENT.get(url, headers=headers)
+    if r.status_code != 304:
+        r.raise_for_status()
+    return r
+
+
+# "275.730,50" -> "275730.50" en una sola pasada (sin strings intermedios)
+_AR_DECIMAL = str.maketrans({".": "", ",": "."})
+
+# Todo Latin-1 que no sea dígito, coma, punto o signo (incluye NBSP): se borra con
+# str.translate en C; la regex queda solo para lo que esté fuera de ese rango.
+_NUM_DROP = str.maketrans("", "", "".join(chr(i) for i in range(256) if chr(i) not in "0123456789,.-"))
+
+# Regex precompiladas (se usan por celda)
+_RE_WS = re.compile(r"\s+")
+_RE_NON_NUM = re.compile(r"[^0-9,.\-]")
+_RE_FUTURE_MONTH = re.compile(r"\b(ENE|FEB|MAR|ABR|MAY|JUN|JUL|AGO|SEP|OCT|NOV|DIC)\b", re.I)
+_RE_FUTURE_PERIOD = re.compile(r"\b\d{2}/\d{4}\b")
+_RE_FUTURE_MARKET = re.compile(r"(ROS|BAHIA|CHICAGO|MATBA|CBOT)", re.I)
+_RE_VAR_COL = re.compile(r"\bvar(iaz|iaci|iación|iacion)?\b")
 
 
 def _clean_num(val: str) -> Optional[float]:
@@ -96,24 +149,17 @@ def _clean_num(val: str) -> Optional[float]:
     s_low = s.lower()
     if s_low in ("s/c", "sc", "s / c", "-", ""):
         return None
-
-    # Normalizar espacios (NBSP/thin-space)
-    s = s.replace("\xa0", " ").replace("\u2009", " ").replace("\u202f", " ")
-    s = re.sub(r"\s+", " ", s)
-
     # Eliminar todo lo que no sea dígito, coma, punto o signo
-    s = re.sub(r"[^0-9,.\-]", "", s)
-
-    # Si tiene coma y punto, asumir formato ES: "1.234,56" -> "1234.56"
-    if "," in s and "." in s:
-        s = s.replace(".", "").replace(",", ".")
-    else:
-        # Solo coma => decimal ES
-        if "," in s:
-            s = s.replace(",", ".")
-        # Solo punto => decimal EN (dejar)
-        # Sin separadores => dejar
-
+    s = s.translate(_NUM_DROP)
+    if not s.isascii():
+        s = _RE_NON_NUM.sub("", s)
+    coma, punto = s.rfind(","), s.rfind(".")
+    if coma > punto:
+        # decimal ES: "1.234,56" -> "1234.56" (o solo coma: "230,5")
+        s = s.translate(_AR_DECIMAL)
+    elif coma != -1:
+        # decimal EN: "275,730.00" -> "275730.00"
+        s = s.replace(",", "")
     try:
         return float(s)
     except ValueError:
@@ -124,12 +170,14 @@ def _looks_like_future(name: str) -> bool:
     if not name:
         return False
     # Meses + formatos comunes (ENE, FEB, 11/2025, ROS, MATBA, etc.)
-    return bool(re.search(r"\b(ENE|FEB|MAR|ABR|MAY|JUN|JUL|AGO|SEP|OCT|NOV|DIC)\b", name, re.I) or
-                re.search(r"\b\d{2}/\d{4}\b", name) or
-                re.search(r"(ROS|BAHIA|CHICAGO|MATBA|CBOT)", name, re.I))
+    return bool(_RE_FUTURE_MONTH.search(name) or
+                _RE_FUTURE_PERIOD.search(name) or
+                _RE_FUTURE_MARKET.search(name))
 
 
 # Cache en memoria: { cache_key: (ts_seg, data_list) }
+# Acotado por construcción: la clave es plaza normalizada (6 valores de normalize_plaza)
+# x only_base (0/1), así que nunca pasa de 12 entradas.
 _CACHE: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
 _CACHE_TTL = 120.0  # segundos
 
@@ -138,73 +186,133 @@ def _cache_get(key: str) -> Optional[List[Dict[str, Any]]]:
     if not pack:
         return None
     ts, data = pack
-    if time.time() - ts < _CACHE_TTL:
+    # mismo TTL (adaptativo) que el documento del que salen los datos
+    if time.time() - ts < _DOC_CACHE["ttl"]:
         return data
+    # vencida: se libera la lista en vez de retenerla hasta el próximo _cache_set
+    _CACHE.pop(key, None)
     return None
 
 def _cache_set(key: str, data: List[Dict[str, Any]]) -> None:
     _CACHE[key] = (time.time(), data)
 
 
-# ---------------------------
-# Parsing de la página
-# ---------------------------
+# Árbol lxml de SOURCE_URL (una descarga + un parseo compartidos por todas las plazas).
+# TTL adaptativo: la pizarra se publica pocas veces por día, así que cada revalidación
+# sin cambios (304, o 200 con el mismo cuerpo) duplica el TTL hasta _DOC_TTL_MAX;
+# un cambio real lo vuelve a _CACHE_TTL e invalida los resultados por plaza.
+_DOC_TTL_MAX = 1800.0
+_DOC_CACHE: Dict[str, Any] = {
+    "ts": 0.0, "ttl": _CACHE_TTL, "etag": None, "last_modified": None, "hash": None, "doc": None,
+    "sections": {},  # título de plaza (sin acentos, minúscula) -> tablas; ver _plaza_sections
+}
 
-def _find_plaza_tables(soup: BeautifulSoup, titulo_text: str) -> List[BeautifulSoup]:
+def _slice_pizarras(html: str) -> str:
     """
-    Busca el <div class="titulo-tabla">titulo_text</div> y devuelve las
-    <table class="tabla-cotizaciones"> hasta el próximo título.
+    Recorta el HTML al tramo entre el primer título de plaza y el cierre de la última
+    tabla: <head>, scripts, menú y footer no se parsean. Sin títulos, devuelve todo.
     """
-    titles = soup.select("div.titulo-tabla")
-    start_idx = -1
-    for idx, t in enumerate(titles):
-        ttxt = (t.get_text() or "").strip()
-        if _strip_accents(ttxt).lower() == _strip_accents(titulo_text).lower():
-            start_idx = idx
-            break
-
-    if start_idx == -1:
-        return []
+    i = html.find("titulo-tabla")
+    if i < 0:
+        return html
+    start = html.rfind("<", 0, i)
+    end = html.rfind("</table>")
+    if start < 0 or end < i:
+        return html
+    return html[start:end + len("</table>")]
+
+# Revalidación en curso: los pedidos concurrentes (de cualquier plaza) esperan la misma
+# descarga en lugar de salir todos al sitio cuando vence el TTL (single-flight)
+_INFLIGHT: Dict[str, "asyncio.Task"] = {}
+
+async def _get_sections() -> Dict[str, List[Any]]:
+    dc = _DOC_CACHE
+    if dc["doc"] is not None and time.time() - dc["ts"] < dc["ttl"]:
+        return dc["sections"]
+    task = _INFLIGHT.get(SOURCE_URL)
+    if task is None:
+        task = asyncio.ensure_future(_refresh_doc())
+        _INFLIGHT[SOURCE_URL] = task
+        task.add_done_callback(lambda _t: _INFLIGHT.pop(SOURCE_URL, None))
+    # shield: si un cliente corta, la descarga sigue para los demás
+    return await asyncio.shield(task)
+
+async def _refresh_doc() -> Dict[str, List[Any]]:
+    dc = _DOC_CACHE
+    doc = dc["doc"]
+    headers: Dict[str, str] = {}
+    if doc is not None:
+        if dc["etag"]:
+            headers["If-None-Match"] = dc["etag"]
+        if dc["last_modified"]:
+            headers["If-Modified-Since"] = dc["last_modified"]
+
+    r = await fetch_page(SOURCE_URL, headers=headers or None)
+    body_hash = hash(r.content) if r.status_code != 304 else None
+    if doc is not None and (r.status_code == 304 or body_hash == dc["hash"]):
+        # sin cambios: no se reparsea, solo se estira el TTL
+        dc["ts"] = time.time()
+        dc["ttl"] = min(dc["ttl"] * 2, _DOC_TTL_MAX)
+        return dc["sections"]
+
+    doc = lxml.html.fromstring(_slice_pizarras(r.text))
+    _CACHE.clear()
+    dc.update(
+        ts=time.time(), ttl=_CACHE_TTL, doc=doc, hash=body_hash, sections=_plaza_sections(doc),
+        etag=r.headers.get("ETag"), last_modified=r.headers.get("Last-Modified"),
+    )
+    return dc["sections"]
 
-    start_node = titles[start_idx]
-    end_node = titles[start_idx + 1] if start_idx + 1 < len(titles) else None
 
-    tables: List[BeautifulSoup] = []
-    for sib in start_node.find_all_next():
-        if end_node and sib == end_node:
-            break
-        if sib.name == "table" and "tabla-cotizaciones" in (sib.get("class") or []):
-            tables.append(sib)
+# ---------------------------
+# Parsing de la página
+# ---------------------------
+
+# XPath precompiladas: el recorrido del DOM corre en C (lxml), sin wrappers de BS4
+_X_TITLES_AND_TABLES = etree.XPath(
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' titulo-tabla ')]"
+    " | //table[contains(concat(' ', normalize-space(@class), ' '), ' tabla-cotizaciones ')]"
+)
+_X_THEAD = etree.XPath("(.//thead)[1]")
+_X_FIRST_TR = etree.XPath("(.//tr)[1]")
+_X_HEAD_CELLS = etree.XPath(".//th | .//td")
+_X_ROWS = etree.XPath(".//tr")
+_X_TDS = etree.XPath(".//td")
+# Texto visible (como get_text de BS4: sin comentarios, script ni style)
+_X_TEXT = etree.XPath(".//text()[not(parent::script) and not(parent::style)]")
 
-    # Fallback defensivo
-    if not tables:
-        candidates = start_node.find_all_next("table", class_="tabla-cotizaciones")
-        if end_node:
-            limited = []
-            for tbl in candidates:
-                if tbl.find_previous("div", class_="titulo-tabla") == start_node:
-                    limited.append(tbl)
-                else:
-                    break
-            tables = limited
-        else:
-            tables = candidates
 
-    return tables
+def _node_text(el) -> str:
+    """Equivalente a get_text(" ", strip=True) de BS4."""
+    return " ".join(t for t in (x.strip() for x in _X_TEXT(el)) if t)
 
 
-def _detect_currency(table_tag: BeautifulSoup, default_currency: str) -> str:
+def _plaza_sections(doc) -> Dict[str, List[Any]]:
+    """
+    Una sola pasada en orden de documento por títulos y tablas: para cada
+    <div class="titulo-tabla"> junta las <table class="tabla-cotizaciones"> hasta el
+    próximo título. Clave: título sin acentos en minúscula (si se repite, vale el primero).
+    Se calcula una vez por documento y lo comparten todas las plazas.
+    """
+    sections: Dict[str, List[Any]] = {}
+    current: Optional[List[Any]] = None
+    for el in _X_TITLES_AND_TABLES(doc):
+        if el.tag == "div":
+            key = _strip_accents(el.text_content().strip()).lower()
+            current = [] if key in sections else sections.setdefault(key, [])
+        elif current is not None:
+            current.append(el)
+    return sections
+
+
+def _detect_currency(table_el, default_currency: str) -> str:
     """
     Detecta ARS/USD por encabezado (thead o primer tr). Fallback a default_currency.
     """
     header_text = ""
-    thead = table_tag.find("thead")
-    if thead:
-        header_text = thead.get_text(" ", strip=True)
-    else:
-        first_tr = table_tag.find("tr")
-        if first_tr:
-            header_text = first_tr.get_text(" ", strip=True)
+    head = _X_THEAD(table_el) or _X_FIRST_TR(table_el)
+    if head:
+        header_text = _node_text(head[0])
 
     h = _strip_accents((header_text or "").lower())
     if "dolares" in h or "dólares" in h:
@@ -215,12 +323,12 @@ def _detect_currency(table_tag: BeautifulSoup, default_currency: str) -> str:
 
 
 def _td_text(td) -> str:
-    txt = td.get_text(" ", strip=True)
-    txt = re.sub(r"\s+", " ", txt or "")
+    txt = _node_text(td)
+    txt = _RE_WS.sub(" ", txt or "")
     return txt.strip()
 
 
-def _header_map(table_tag: BeautifulSoup) -> Dict[str, int]:
+def _header_map(table_el) -> Dict[str, int]:
     """
     Intenta mapear las columnas por nombre para identificar 'Actual'.
     Retorna dict como {'producto': idx, 'actual': idx, 'anterior': idx, 'var': idx}
@@ -228,15 +336,10 @@ def _header_map(table_tag: BeautifulSoup) -> Dict[str, int]:
     """
     # Buscar th en thead o primera fila
     heads = []
-    thead = table_tag.find("thead")
-    if thead:
-        tr = thead.find("tr")
-        if tr:
-            heads = tr.find_all(["th", "td"])
-    else:
-        first_tr = table_tag.find("tr")
-        if first_tr:
-            heads = first_tr.find_all(["th", "td"])
+    thead = _X_THEAD(table_el)
+    first_tr = _X_FIRST_TR(thead[0] if thead else table_el)
+    if first_tr:
+        heads = _X_HEAD_CELLS(first_tr[0])
 
     if not heads:
         return {}
@@ -250,30 +353,51 @@ def _header_map(table_tag: BeautifulSoup) -> Dict[str, int]:
             m["actual"] = i
         if "anterior" in n:
             m["anterior"] = i
-        if re.search(r"\bvar(iaz|iaci|iación|iacion)?\b", n):
+        if _RE_VAR_COL.search(n):
             m["var"] = i
     return m
 
 
-def _parse_table(table_tag: BeautifulSoup, forced_currency: Optional[str], order_idx: int) -> List[Dict[str, Any]]:
+class Item(NamedTuple):
+    """Fila de cotización; se pasa a dict una sola vez, al guardar en cache."""
+    producto: str
+    precio: Optional[float]
+    moneda: str
+    anterior: str = "s/c"
+    variacion: str = "s/c"
+
+
+# Normalización de nombres (clave: producto en minúscula)
+RENAME = {
+    "trigo": "Trigo",
+    "maiz": "Maiz",
+    "maíz": "Maiz",
+    "soja": "Soja",
+    "sorgo": "Sorgo",
+    "girasol": "Girasol",
+    "trigo art 12": "Trigo Art 12",
+}
+
+
+def _parse_table(table_el, forced_currency: Optional[str], order_idx: int) -> List[Item]:
     """
     Parsea una tabla de cotizaciones: detecta moneda, ubica columna 'Actual' por encabezado
     y/o usa fallback buscando la primera celda numérica utilizable.
     """
-    currency = forced_currency or _detect_currency(table_tag, default_currency=("ARS" if order_idx == 0 else "USD"))
-    rows = table_tag.find_all("tr")
-    items: List[Dict[str, Any]] = []
+    currency = forced_currency or _detect_currency(table_el, default_currency=("ARS" if order_idx == 0 else "USD"))
+    rows = _X_ROWS(table_el)
+    items: List[Item] = []
 
     # Determinar si la primera fila es encabezado
-    header = _header_map(table_tag)
+    header = _header_map(table_el)
     header_cols = set(header.values()) if header else set()
 
     for r_idx, tr in enumerate(rows):
-        classes = " ".join(tr.get("class", [])).lower()
+        classes = (tr.get("class") or "").lower()
         if "head" in classes or "encabezado" in classes:
             continue
 
-        tds = tr.find_all("td")
+        tds = _X_TDS(tr)
         if len(tds) < 2:
             continue
 
@@ -307,38 +431,18 @@ def _parse_table(table_tag: BeautifulSoup, forced_currency: Optional[str], order
                     precio = _clean_num(txt)
                     break
 
-        items.append({
-            "producto": producto.strip(),
-            "precio": precio,
-            "moneda": currency,
-            "anterior": "s/c",
-            "variacion": "s/c",
-        })
-
-    # Normalización de nombres
-    rename = {
-        "trigo": "Trigo",
-        "maiz": "Maiz",
-        "maíz": "Maiz",
-        "soja": "Soja",
-        "sorgo": "Sorgo",
-        "girasol": "Girasol",
-        "trigo art 12": "Trigo Art 12",
-    }
-    norm_items: List[Dict[str, Any]] = []
-    for it in items:
-        key = rename.get(it["producto"].strip().lower(), it["producto"].strip())
-        norm_items.append({**it, "producto": key})
-    return norm_items
+        producto = producto.strip()
+        items.append(Item(RENAME.get(producto.lower(), producto), precio, currency))
+
+    return items
 
 
-def scrape_plaza(plaza_norm: str) -> List[Dict[str, Any]]:
+async def scrape_plaza(plaza_norm: str) -> List[Item]:
     # "Locales" hoy no tiene bloque estable en la fuente pública.
     if plaza_norm == "locales":
         return []
 
-    html = fetch_html(SOURCE_URL)
-    soup = BeautifulSoup(html, "html.parser")
+    sections = await _get_sections()
 
     label_map = {
         "rosario": "Rosario",
@@ -349,11 +453,11 @@ def scrape_plaza(plaza_norm: str) -> List[Dict[str, Any]]:
     }
     titulo_text = label_map.get(plaza_norm, "Rosario")
 
-    tables = _find_plaza_tables(soup, titulo_text)
+    tables = sections.get(_strip_accents(titulo_text).lower())
     if not tables:
         return []
 
-    items: List[Dict[str, Any]] = []
+    items: List[Item] = []
     for idx, tbl in enumerate(tables):
         currency = _detect_currency(tbl, default_currency=("ARS" if idx == 0 else "USD"))
         items += _parse_table(tbl, forced_currency=currency, order_idx=idx)
@@ -361,6 +465,33 @@ def scrape_plaza(plaza_norm: str) -> List[Dict[str, Any]]:
     return items
 
 
+async def _scrape_to_cache(plaza_norm: str) -> None:
+    """Scrapea la plaza y deja en cache las dos vistas (only_base=1 y 0)."""
+    items = await scrape_plaza(plaza_norm)
+    _cache_set(f"{plaza_norm}|ob=0", [it._asdict() for it in items])
+    # Filtrado conservador: con only_base=1 ocultamos entradas que parezcan futuros/entregas
+    _cache_set(f"{plaza_norm}|ob=1", [it._asdict() for it in items if not _looks_like_future(it.producto)])
+
+
+_PLAZAS = ("rosario", "bahia", "cordoba", "quequen", "darsena")
+
+async def _refresh_loop() -> None:
+    """
+    Stale-while-revalidate: renueva el cache de todas las plazas un poco antes de que
+    venza, así ningún pedido paga la latencia del scrape. Si falla, el endpoint vuelve
+    a scrapear a demanda y el loop reintenta en la próxima vuelta.
+    """
+    while True:
+        try:
+            for p in _PLAZAS:
+                await _scrape_to_cache(p)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            pass
+        await asyncio.sleep(max(_DOC_CACHE["ttl"] - 10.0, 10.0))
+
+
 # ---------------------------
 # Endpoints
 # ---------------------------
@@ -371,7 +502,7 @@ def health() -> Dict[str, Any]:
 
 
 @app.get("/api/cotizaciones")
-def cotizaciones(
+async def cotizaciones(
     plaza: str = Query("rosario"),
     only_base: int = Query(1),
 ) -> Dict[str, Any]:
@@ -387,16 +518,11 @@ def cotizaciones(
     if cached is not None:
         return {"items": cached, "plaza": plaza_norm, "source_url": SOURCE_URL, "cached": True}
 
+    # Normalmente lo llena _refresh_loop; esto cubre el arranque en frío y los errores
     try:
-        items = scrape_plaza(plaza_norm)
-
-        # Filtrado conservador: si only_base=1 ocultamos entradas que parezcan futuros/entregas
-        if int(only_base) == 1:
-            items = [it for it in items if not _looks_like_future(it.get("producto", ""))]
-
-        _cache_set(cache_key, items)
-        return {"items": items, "plaza": plaza_norm, "source_url": SOURCE_URL, "cached": False}
-    except requests.Timeout:
+        await _scrape_to_cache(plaza_norm)
+        return {"items": _CACHE[cache_key][1], "plaza": plaza_norm, "source_url": SOURCE_URL, "cached": False}
+    except httpx.TimeoutException:
         return {"items": [], "plaza": plaza_norm, "source_url": SOURCE_URL, "error": "timeout"}
     except Exception as ex:
         return {"items": [], "plaza": plaza_norm, "source_url": SOURCE_URL, "error": f"{type(ex).__name__}: {ex}"}
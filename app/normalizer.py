@@ -1,6 +1,9 @@
 # app/normalizer.py
 from __future__ import annotations
-import pandas as pd
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 # Alias de productos por fuente (extensible)
 PRODUCT_ALIASES = {
@@ -18,11 +21,15 @@ PRODUCT_ALIASES = {
 
 STANDARD_COLUMNS = ["fecha", "producto", "precio", "fuente"]
 
+# quita separador de miles, espacios y "$"; coma decimal -> punto (una pasada)
+_PRICE_TRANS = str.maketrans({".": "", " ": "", "$": "", ",": "."})
+
 def _std_cols(df: pd.DataFrame) -> pd.DataFrame:
     """
     Normaliza columnas: fecha, producto, precio, fuente.
     Acepta variantes comunes en csv/tablas.
     """
+    import pandas as pd
     if df is None or df.empty:
         return pd.DataFrame(columns=STANDARD_COLUMNS)
 
@@ -72,6 +79,7 @@ def _normalize_producto(row: pd.Series) -> str | None:
 
 def _normalize_fecha(row: pd.Series) -> str | None:
     """Devuelve fecha en dd/mm/yyyy si viene en otro formato común."""
+    import pandas as pd
     val = row.get("fecha")
     if not val or pd.isna(val):
         return val
@@ -90,6 +98,7 @@ def normalize_df(df: pd.DataFrame) -> pd.DataFrame:
     """
     Normaliza columnas, fecha y producto; asegura tipos y orden.
     """
+    import pandas as pd
     df = _std_cols(df).copy()
 
     if df.empty:
@@ -103,7 +112,7 @@ def normalize_df(df: pd.DataFrame) -> pd.DataFrame:
     def to_float(x):
         if x is None or pd.isna(x): 
             return None
-        s = str(x).replace(".", "").replace(" ", "").replace("$", "").replace(",", ".")
+        s = str(x).translate(_PRICE_TRANS)
         try:
             return float(s)
         except Exception:
@@ -1,23 +1,48 @@
-import pandas as pd
-from .bcr_locales import scrape as bcr_locales
-from .bdec_bsas import scrape as bdec_bsas
-from .bcp_bahia import scrape as bcp_bahia
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from . import bcr_locales as _bcr_locales, bdec_bsas as _bdec_bsas, bcp_bahia as _bcp_bahia
+from ._pool import run_all
 from ..normalizer import normalize_df
 
+bcr_locales = _bcr_locales.scrape
+bdec_bsas = _bdec_bsas.scrape
+bcp_bahia = _bcp_bahia.scrape
+
+if TYPE_CHECKING:
+    import pandas as pd
+
 SOURCES = {
     "bcr_locales": bcr_locales,
     "bdec_bsas": bdec_bsas,
     "bcp_bahia":  bcp_bahia,
 }
 
+# fuente -> módulo con scrape_async (GET simple o Chromium, y parseo)
+_MODULES = {
+    "bcr_locales": _bcr_locales,
+    "bdec_bsas": _bdec_bsas,
+    "bcp_bahia": _bcp_bahia,
+}
+
 def run_selected(sources, **kwargs) -> pd.DataFrame:
+    import pandas as pd  # diferido: no cargar pandas en el arranque de la API
     outs = []
-    for key in sources:
-        fn = SOURCES.get(key)
-        if not fn:
-            continue
+    keys = [k for k in sources if k in _MODULES]
+    # kwargs que no corresponden (TypeError al armar la corutina) quedan como error de esa fuente
+    results, coros = {}, {}
+    for k in keys:
+        try:
+            coros[k] = _MODULES[k].scrape_async(**kwargs)
+        except Exception as ex:
+            results[k] = ex
+    # todas las fuentes a la vez, sobre el mismo cliente HTTP / Chromium
+    if coros:
+        results.update(zip(coros, run_all(list(coros.values()))))
+    for key in keys:
+        df = results[key]
         try:
-            df = fn(**kwargs)
+            if isinstance(df, BaseException):
+                raise df
             if df is not None and not df.empty:
                 outs.append(df)
         except Exception as ex:
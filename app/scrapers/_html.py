@@ -0,0 +1,55 @@
+# app/scrapers/_html.py
+# Lectura de tablas con lxml directo (XPath compilados): sin la capa de objetos Tag de bs4.
+from typing import Iterator, List
+
+import lxml.html
+from lxml import etree
+
+_X_TABLES = etree.XPath("//table")
+_X_ROWS = etree.XPath(".//tr")
+_X_CELLS = etree.XPath(".//td | .//th")
+_X_TEXT = etree.XPath(".//text()[not(parent::script) and not(parent::style)]")
+# primer texto que contenga "cotizaciones" (sin distinguir mayúsculas)
+_X_COTIZ = etree.XPath(
+    "(//text()[not(parent::script) and not(parent::style)]"
+    "[contains(translate(., 'COTIZANES', 'cotizanes'), 'cotizaciones')])[1]"
+)
+_X_BLOCK = etree.XPath("ancestor-or-self::*[self::section or self::div][1]")
+
+def parse_html(html: str):
+    # lxml no acepta documentos vacíos (bs4 sí): se parsea un <html/> sin tablas
+    return lxml.html.fromstring(html if html and html.strip() else "<html/>")
+
+def node_text(el) -> str:
+    """Equivalente a get_text(" ", strip=True) de BS4."""
+    return " ".join(t for t in (x.strip() for x in _X_TEXT(el)) if t)
+
+def table_rows(doc) -> Iterator[List[str]]:
+    """Texto de las celdas td/th de cada <tr>, tabla por tabla (como select("table") + select("tr"))."""
+    for table in _X_TABLES(doc):
+        for tr in _X_ROWS(table):
+            yield [node_text(td) for td in _X_CELLS(tr)]
+
+def cotizaciones_text(doc) -> str:
+    """Texto del <section>/<div> que contiene "Cotizaciones"; sin ese texto, el del documento."""
+    hit = _X_COTIZ(doc)
+    if not hit:
+        return node_text(doc)
+    el = hit[0].getparent()
+    if hit[0].is_tail:
+        el = el.getparent()
+    block = _X_BLOCK(el)
+    return node_text(block[0] if block else doc)
+
+# Mismo recorrido que table_rows pero dentro del navegador, para
+# page.eval_on_selector_all("table", TABLE_ROWS_JS): devuelve listas de celdas ya como
+# texto y evita serializar el DOM con page.content() y volver a parsearlo.
+TABLE_ROWS_JS = """tables => tables.flatMap(t => Array.from(t.querySelectorAll("tr"), tr =>
+    Array.from(tr.querySelectorAll("td, th"), c => {
+        const w = document.createTreeWalker(c, NodeFilter.SHOW_TEXT), out = [];
+        for (let n; (n = w.nextNode());) {
+            const p = n.parentNode.nodeName, t = n.data.trim();
+            if (t && p !== "SCRIPT" && p !== "STYLE") out.push(t);
+        }
+        return out.join(" ");
+    })))"""
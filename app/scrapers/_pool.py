@@ -0,0 +1,143 @@
+# app/scrapers/_pool.py
+# Un único Chromium por proceso, compartido por todos los scrapers.
+# Playwright async corre en un event loop propio (hilo daemon): cada scrape abre su
+# propio context (barato) y varias fuentes pueden navegar a la vez sobre el mismo browser.
+import asyncio
+import atexit
+import re
+import threading
+
+from ..config import SAVE_DEBUG_HTML
+
+_LOCK = threading.Lock()
+_LOOP = None
+_PW = None
+_BROWSER = None
+_LAUNCH = None  # tarea de arranque: los fetchers concurrentes esperan el mismo launch
+
+def _loop():
+    global _LOOP
+    if _LOOP is None:
+        with _LOCK:
+            if _LOOP is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="playwright", daemon=True).start()
+                _LOOP = loop
+                atexit.register(close_browser)
+    return _LOOP
+
+async def _launch():
+    global _PW, _BROWSER, _LAUNCH
+    try:
+        from playwright.async_api import async_playwright
+        _PW = await async_playwright().start()
+        _BROWSER = await _PW.chromium.launch(headless=True, args=["--disable-dev-shm-usage"])
+        return _BROWSER
+    except Exception:
+        # si falló el launch, el driver ya arrancado no queda colgado entre reintentos
+        if _PW is not None:
+            try: await _PW.stop()
+            except Exception: pass
+            _PW = None
+        _LAUNCH = None  # el próximo pedido reintenta
+        raise
+
+async def get_browser():
+    """Devuelve el browser compartido; lo lanza en el primer uso. Solo en el loop de _loop()."""
+    global _LAUNCH
+    if _BROWSER is not None:
+        return _BROWSER
+    if _LAUNCH is None:
+        _LAUNCH = asyncio.ensure_future(_launch())
+    return await asyncio.shield(_LAUNCH)
+
+# Los scrapers solo leen el HTML: imágenes, fuentes, media y CSS no se descargan
+# (salvo con SAVE_DEBUG_HTML, donde la captura de pantalla los necesita).
+_BLOCKED = frozenset({"image", "font", "media", "stylesheet"})
+
+async def _route(route):
+    if route.request.resource_type in _BLOCKED:
+        await route.abort()
+    else:
+        await route.continue_()
+
+async def new_context(browser, **kwargs):
+    """browser.new_context(**kwargs) con los recursos que no se parsean bloqueados."""
+    ctx = await browser.new_context(**kwargs)
+    if not SAVE_DEBUG_HTML:
+        await ctx.route("**/*", _route)
+    return ctx
+
+# Un único intento con todas las variantes: antes cada texto que no aparecía costaba
+# hasta 1,2 s de espera, casi 5 s por scrape en páginas sin banner. El texto del botón
+# tiene que empezar con la variante (y "OK" como palabra): si no, "ok" matchea dentro de
+# "Configurar cookies" o "Facebook" y se abre el modal de preferencias sobre la tabla.
+_COOKIES_RE = re.compile(r"^\s*(?:Aceptar|Acepto|No, gracias)|\bOK\b", re.I)
+# Sin un contenedor de cookies/consentimiento visible no se intenta el click
+_COOKIES_BANNER = "[id*=cookie i], [class*=cookie i], [id*=consent i], [class*=consent i]"
+
+async def dismiss_cookies(page) -> None:
+    """Cierra el banner de cookies si hay un botón para eso; si no aparece, sigue."""
+    try:
+        if not await page.locator(_COOKIES_BANNER).first.is_visible():
+            return
+        await page.get_by_role("button", name=_COOKIES_RE).first.click(timeout=800)
+    except Exception:
+        pass
+
+# Muchas páginas traen los precios en el HTML del servidor: se prueba primero un GET
+# simple y Chromium queda solo para cuando hace falta ejecutar JS.
+_HTTP = None
+_UA = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"
+)
+
+async def fetch_static(url: str):
+    """HTML de url sin navegador (httpx, keep-alive entre scrapes); None si falla."""
+    global _HTTP
+    if _HTTP is None:
+        import httpx
+        _HTTP = httpx.AsyncClient(
+            headers={"User-Agent": _UA, "Accept-Language": "es-AR,es;q=0.9"},
+            timeout=10, follow_redirects=True,
+        )
+    try:
+        r = await _HTTP.get(url)
+        r.raise_for_status()
+        return r.text
+    except Exception:
+        return None
+
+def run_all(coros) -> list:
+    """
+    Corre las corutinas en paralelo en el loop de Playwright (browser y cliente compartidos).
+    Devuelve un resultado por corutina, en orden; si una falla, en su lugar va la excepción.
+    """
+    async def _run():
+        return await asyncio.gather(*coros, return_exceptions=True)
+    return asyncio.run_coroutine_threadsafe(_run(), _loop()).result()
+
+async def _close() -> None:
+    global _PW, _BROWSER, _LAUNCH, _HTTP
+    try:
+        if _HTTP is not None:
+            await _HTTP.aclose()
+        if _BROWSER is not None:
+            await _BROWSER.close()
+        if _PW is not None:
+            await _PW.stop()
+    except Exception:
+        pass
+    _PW = None
+    _BROWSER = None
+    _LAUNCH = None
+    _HTTP = None
+
+def close_browser() -> None:
+    if _LOOP is None:
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(_close(), _LOOP).result(timeout=10)
+    except Exception:
+        pass
@@ -1,70 +1,126 @@
-from playwright.sync_api import sync_playwright
-from bs4 import BeautifulSoup
+from __future__ import annotations
+from typing import TYPE_CHECKING
 from datetime import datetime
-import pandas as pd, re, os
+import re, os
 from pathlib import Path
 from ..config import DATA_DIR, SAVE_DEBUG_HTML
+from ._pool import dismiss_cookies, fetch_static, get_browser, new_context, run_all
+from ._html import TABLE_ROWS_JS, parse_html, table_rows, cotizaciones_text
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 URL = "https://www.bcr.com.ar/es/mercados/mercado-de-granos/cotizaciones/cotizaciones-locales-0"
 
 PRODUCTOS = ["Soja", "Maíz", "Trigo", "Girasol", "Sorgo"]
+FUENTE = "BCR – Locales"
+
+# una sola regex encuentra todos los productos del texto; gana el primero de PRODUCTOS
+_PROD_RE = re.compile(r"\b(" + "|".join(map(re.escape, PRODUCTOS)) + r")\b", re.I)
+_PRECIO_RE = re.compile(r"(\$|US\$)?\s*([\d\.]+,\d{1,2}|\d+)")
+_PROD_PRECIO_RE = {p: re.compile(rf"{p}.*?(\$|US\$)?\s*([\d\.]+,\d+|\d+)", re.I) for p in PRODUCTOS}
+
+def _producto(texto: str) -> str | None:
+    found = {m.lower() for m in _PROD_RE.findall(texto)}
+    return next((p for p in PRODUCTOS if p.lower() in found), None) if found else None
 
 def _out_dir(fecha_iso:str) -> Path:
     d = Path(DATA_DIR) / "out" / fecha_iso; d.mkdir(parents=True, exist_ok=True); return d
 
+# "$ 1.234,5" -> " 1234.5" en una pasada. Como antes, "US$" queda como "US" y no parsea.
+_NUM_TRANS = str.maketrans({"$": None, ".": None, ",": "."})
+
 def _to_num(t: str) -> float | None:
     if not t: return None
-    t = t.replace("$","").replace("US$","").replace("ARS","").replace(".","").replace(",",".").strip()
+    t = t.translate(_NUM_TRANS).replace("ARS","").strip()
     try: return float(t)
     except: return None
 
-def scrape(fecha_iso: str) -> pd.DataFrame:
+async def fetch_rows(browser, fecha_iso: str) -> tuple[list[list[str]], str | None]:
+    """
+    Navega URL en un context propio sobre el browser compartido y devuelve las celdas de
+    cada fila y el HTML, que solo se serializa si hace falta (fallback o SAVE_DEBUG_HTML).
+    """
     out = _out_dir(fecha_iso)
-
-    with sync_playwright() as p:
-        b = p.chromium.launch(headless=True, args=["--disable-dev-shm-usage"])
-        page = b.new_page(viewport={"width":1440,"height":900})
-        page.goto(URL, wait_until="networkidle", timeout=60000)
-        # cookies
-        for txt in ("Aceptar", "Acepto", "No, gracias", "OK"):
-            try: page.get_by_text(txt, exact=False).first.click(timeout=1200)
-            except: pass
-        html = page.content()
+    ctx = await new_context(browser, viewport={"width":1440,"height":900})
+    try:
+        page = await ctx.new_page()
+        # networkidle espera silencio de red (ads/analytics): alcanza con el DOM y la tabla
+        await page.goto(URL, wait_until="domcontentloaded", timeout=20000)
+        try: await page.locator("table").or_(page.get_by_text("Cotizaciones")).first.wait_for(timeout=15000)
+        except: pass
+        await dismiss_cookies(page)
+        # celdas extraídas en el navegador; el fallback de textos sueltos necesita el documento
+        rows = await page.eval_on_selector_all("table", TABLE_ROWS_JS)
+        html = await page.content() if SAVE_DEBUG_HTML or not _from_rows(rows)[1] else None
         if SAVE_DEBUG_HTML:
-            (out/"bcr_locales_raw.html").write_text(html,encoding="utf-8")
-            (out/"bcr_locales.png").write_bytes(page.screenshot(full_page=True))
-        b.close()
+            (out/"bcr_locales_raw.html").write_text(html, encoding="utf-8")
+            (out/"bcr_locales.png").write_bytes(await page.screenshot(full_page=True))
+    finally:
+        await ctx.close()
+    return rows, html
+
+async def scrape_async(fecha_iso: str) -> pd.DataFrame:
+    # primero el HTML del servidor; si no trae precios, se renderiza con Chromium
+    html = await fetch_static(URL)
+    if html is not None:
+        df = parse(html, fecha_iso)
+        if not df.empty:
+            return df
+    rows, html = await fetch_rows(await get_browser(), fecha_iso)
+    return parse_rows(rows, fecha_iso, parse_html(html) if html is not None else None)
+
+def scrape(fecha_iso: str) -> pd.DataFrame:
+    df, = run_all([scrape_async(fecha_iso)])
+    if isinstance(df, BaseException):
+        raise df
+    return df
+
+def _from_rows(rows) -> tuple[list, list]:
+    productos, precios = [], []
+    for tds in rows:
+        if len(tds) < 2: continue
+        texto = " ".join(tds)
+        prod = _producto(texto)
+        if not prod: continue
+        # buscar número
+        m = _PRECIO_RE.search(texto)
+        if not m: continue
+        precio = _to_num(m.group(0))
+        if precio is None: continue
+        productos.append(prod); precios.append(precio)
+    return productos, precios
+
+def parse(html: str, fecha_iso: str) -> pd.DataFrame:
+    doc = parse_html(html)
+    return parse_rows(table_rows(doc), fecha_iso, doc)
+
+def parse_rows(rows, fecha_iso: str, doc=None) -> pd.DataFrame:
+    """DataFrame a partir de las celdas de cada fila (table_rows o TABLE_ROWS_JS); doc, para el fallback."""
+    import pandas as pd  # diferido: pesado y solo lo usa el scraping real
 
-    soup = BeautifulSoup(html, "lxml")
-    rows = []
     fecha_ui = datetime.strptime(fecha_iso, "%Y-%m-%d").strftime("%d/%m/%Y")
 
     # buscar bloques con “Cotizaciones” o tablas con productos
     # 1) tablas
-    for table in soup.select("table"):
-        for tr in table.select("tbody tr, tr"):
-            tds = [td.get_text(" ",strip=True) for td in tr.select("td,th")]
-            if len(tds) < 2: continue
-            texto = " ".join(tds)
-            prod = next((p for p in PRODUCTOS if re.search(rf"\b{p}\b", texto, re.I)), None)
-            if not prod: continue
-            # buscar número
-            m = re.search(r"(\$|US\$)?\s*([\d\.]+,\d{1,2}|\d+)", texto)
-            if not m: continue
-            precio = _to_num(m.group(0))
-            if precio is None: continue
-            rows.append({"fecha":fecha_ui,"producto":prod,"precio":precio,"fuente":"BCR – Locales"})
+    productos, precios = _from_rows(rows)
 
     # 2) fallback: textos sueltos
-    if not rows:
-        block = soup.find(string=re.compile("Cotizaciones", re.I))
-        block = block.find_parent(["section","div"]) if block else soup
-        text = block.get_text(" ",strip=True)
+    if not precios and doc is not None:
+        text = cotizaciones_text(doc)
         for prod in PRODUCTOS:
-            m = re.search(rf"{prod}.*?(\$|US\$)?\s*([\d\.]+,\d+|\d+)", text, re.I)
+            m = _PROD_PRECIO_RE[prod].search(text)
             if not m: continue
             precio = _to_num(m.group(0)); 
             if precio is None: continue
-            rows.append({"fecha":fecha_ui,"producto":prod,"precio":precio,"fuente":"BCR – Locales"})
+            productos.append(prod); precios.append(precio)
 
-    return pd.DataFrame(rows)
\ No newline at end of file
+    # columnar: fecha y fuente son constantes, solo producto/precio varían por fila.
+    # dtypes explícitos: producto categórico sobre PRODUCTOS y precio float64, sin inferencia
+    n = len(precios)
+    return pd.DataFrame({
+        "fecha": [fecha_ui] * n,
+        "producto": pd.Categorical(productos, categories=PRODUCTOS),
+        "precio": pd.array(precios, dtype="float64"),
+        "fuente": [FUENTE] * n,
+    })
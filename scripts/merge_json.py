@@ -2,23 +2,59 @@
 # scripts/merge_json.py
 import json
 import os
-import glob
-import datetime
+from datetime import date, datetime, timezone
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+try:
+    import orjson  # opcional: el workflow corre este script sin instalar dependencias
+except ImportError:
+    orjson = None
+
 # Dónde publicar los archivos que sirve GitHub Pages:
 # - Por defecto, raíz del repo (OUTPUT_DIR=".")
 # - Si tu Pages usa /docs, seteá OUTPUT_DIR="docs" (desde el workflow)
 OUTPUT_DIR = os.getenv("OUTPUT_DIR", ".").strip() or "."
 OUT_ROOT = Path(__file__).resolve().parents[1] / OUTPUT_DIR
 
-TODAY = datetime.date.today().strftime("%Y-%m-%d")
+_TODAY = date.today().isoformat()
 
 def load_json(path: Path):
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
+def _safe_load(path: Path):
+    try:
+        return load_json(path)
+    except Exception:
+        # tolerante a errores
+        return None
+
+def dump_json(payload) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+    return json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+
+# Campos de salida y su valor por defecto, en el orden en que se publican
+_DEFAULTS = {
+    "producto": None,
+    "precio": None,
+    "moneda": "ARS",
+    "anterior": "s/c",
+    "variacion": "s/c",
+    "unidad": "tn",
+    "fecha": _TODAY,
+    "fuente": "bolsadecereales.com/camara-arbitral",
+    "only_base": 1,
+}
+
 def normalize_item(plaza: str, row: dict):
+    # Caso común (sin campos extra): un solo merge de dicts en C, mismo orden y valores
+    if row.keys() <= _DEFAULTS.keys():
+        return {"plaza": plaza, **_DEFAULTS, **row}
     # Ajustá los campos si tus JSON individuales difieren
     return {
         "plaza": plaza,
@@ -28,88 +64,70 @@ def normalize_item(plaza: str, row: dict):
         "anterior": row.get("anterior", "s/c"),
         "variacion": row.get("variacion", "s/c"),
         "unidad": row.get("unidad", "tn"),
-        "fecha": row.get("fecha", TODAY),
+        "fecha": row.get("fecha", _TODAY),
         "fuente": row.get("fuente", "bolsadecereales.com/camara-arbitral"),
         "only_base": row.get("only_base", 1),
     }
 
+# (subcadenas, plaza): se prueba en orden y gana la primera regla que coincide
+_RULES = (
+    (("rosario", "ros"), "Rosario"),
+    (("bahia", "bahía", "bbca"), "Bahía Blanca"),
+    (("local", "loc"), "Locales"),
+    (("quequen",), "Quequén"),
+    (("darsena", "dársena"), "Dársena"),
+)
+
 def guess_plaza_from_filename(name: str) -> str:
     n = name.lower()
-    if "rosario" in n or "ros" in n:
-        return "Rosario"
-    if "bahia" in n or "bahía" in n or "bbca" in n:
-        return "Bahía Blanca"
-    if "local" in n or "loc" in n:
-        return "Locales"
-    if "quequen" in n:
-        return "Quequén"
-    if "darsena" in n or "dársena" in n:
-        return "Dársena"
-    return "Desconocida"
+    return next((plaza for subs, plaza in _RULES if any(s in n for s in subs)), "Desconocida")
 
 def main():
     OUT_ROOT.mkdir(parents=True, exist_ok=True)
 
-    # Busca JSON individuales donde normalmente los publicás
-    search_roots = [OUT_ROOT]  # raíz (o docs/) que sirve Pages
-    # Si también querés mirar en data/ históricos por si ya existen, se incluye:
-    patterns = [
-        "cotizaciones_*.json",   # raíz/docs
-        "data/**/*.json"         # por si guardaste históricos con ese patrón
-    ]
+    # Busca JSON individuales donde normalmente los publicás: raíz (o docs/) que sirve Pages
+    # y, por si ya existen, los históricos en data/. El patrón filtra los nombres al listar.
+    paths = list(OUT_ROOT.glob("cotizaciones_*.json"))
+    paths += (OUT_ROOT / "data").rglob("cotizaciones_*.json")
 
-    candidates = []
-    for pat in patterns:
-        for base in search_roots:
-            candidates.extend(glob.glob(str(base / pat), recursive=True))
+    # lecturas de disco en paralelo; el armado de items sigue en orden
+    with ThreadPoolExecutor() as ex:
+        loaded = list(ex.map(_safe_load, paths))
 
     items = []
+    by = defaultdict(list)  # by_plaza se arma en la misma pasada
     plazas = set()
 
-    for path in candidates:
-        fname = os.path.basename(path)
-        if not fname.startswith("cotizaciones_"):
-            continue
-        plaza = guess_plaza_from_filename(fname)
-        try:
-            data = load_json(Path(path))
-        except Exception:
-            # tolerante a errores
-            continue
-
+    for path, data in zip(paths, loaded):
+        plaza = guess_plaza_from_filename(path.name)
         # si el JSON tiene {"items": [...]}, usar eso; si es lista directa, usarla
         rows = data.get("items") if isinstance(data, dict) else data
         if not isinstance(rows, list):
             continue
 
         for r in rows:
-            items.append(normalize_item(plaza, r))
+            itm = normalize_item(plaza, r)
+            items.append(itm)
+            by[plaza].append(itm)
         if plaza != "Desconocida":
             plazas.add(plaza)
 
     payload = {
-        "generated_at": datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "generated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
         "source": "Pizarras_Multi_Bolsas_API",
         "plazas": sorted(plazas),
         "items": items,
-        "by_plaza": {},
+        "by_plaza": dict(by),
     }
 
-    # Construir by_plaza
-    by = {}
-    for it in items:
-        by.setdefault(it["plaza"], []).append(it)
-    payload["by_plaza"] = by
-
     # Salidas
-    out_today_dir = OUT_ROOT / "data" / TODAY
+    out_today_dir = OUT_ROOT / "data" / _TODAY
     out_today_dir.mkdir(parents=True, exist_ok=True)
 
-    with open(OUT_ROOT / "all.json", "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
-
-    with open(out_today_dir / "all.json", "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
+    # se serializa una sola vez y se escriben los mismos bytes en las dos salidas
+    buf = dump_json(payload)
+    (OUT_ROOT / "all.json").write_bytes(buf)
+    (out_today_dir / "all.json").write_bytes(buf)
 
     print(f"[merge_json] OK -> {OUT_ROOT/'all.json'} ({len(items)} items)")
     print(f"[merge_json] OK -> {out_today_dir/'all.json'}")
@@ -1,16 +1,23 @@
+import asyncio
 import json
 from pathlib import Path
-from main import cotizaciones
+from main import app, cotizaciones, lifespan
 
-def dump(plaza: str, only_base: int):
-    data = cotizaciones(plaza, only_base)
-    Path("public").mkdir(exist_ok=True, parents=True)
+PLAZAS = ["rosario", "bahia", "cordoba", "quequen", "darsena", "locales"]
+
+def dump(data: dict):
     fn = f"public/cotizaciones_{data['plaza']}.json"
     with open(fn, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False)
 
-for plaza in ["rosario", "bahia", "cordoba", "quequen", "darsena", "locales"]:
-    dump(plaza, 1)
-    dump(plaza, 0)
+async def main():
+    Path("public").mkdir(exist_ok=True, parents=True)
+    # lifespan abre el cliente HTTP compartido; todas las plazas salen de una sola descarga.
+    # Solo only_base=0: el archivo es uno por plaza y la vista ob=1 se escribía y se pisaba.
+    async with lifespan(app):
+        results = await asyncio.gather(*(cotizaciones(plaza, 0) for plaza in PLAZAS))
+    for data in results:
+        dump(data)
 
+asyncio.run(main())
 print("OK")